@@ -18,6 +18,7 @@ import logging
 load_dotenv()
 
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field
 import asyncio
@@ -52,7 +53,8 @@ app = FastAPI(
     description="AI-powered pharmacy automation system with multi-agent orchestration",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=ORJSONResponse,  # orjson is already a dependency
 )
 
 # Initialize observability (must never crash app)
@@ -40,6 +40,9 @@ def populate():
     
     for _, row in df.iterrows():
         data = row.to_dict()
+        # Same normalization as src.models.normalize_medicine_name; set on
+        # both insert and the ON CONFLICT update so renames stay in sync
+        data['name_norm'] = str(data['name']).strip().lower()
         
         columns = ', '.join(data.keys())
         placeholders = ', '.join(['?'] * len(data))
@@ -69,16 +69,20 @@ def seed_medicines():
             # Convert boolean string to integer for SQLite (0/1)
             req_rx = 1 if row['requires_prescription'].lower() == 'true' else 0
             
+            # Same normalization as src.models.normalize_medicine_name;
+            # exact lookups filter on name_norm only
+            name_norm = row['name'].strip().lower()
+            
             if existing:
                 # Update existing
                 cur.execute("""
                     UPDATE medicines SET 
-                        category=?, manufacturer=?, price=?, stock=?, 
+                        name_norm=?, category=?, manufacturer=?, price=?, stock=?, 
                         requires_prescription=?, description=?, indications=?, 
                         generic_equivalent=?, contraindications=?, updated_at=CURRENT_TIMESTAMP
                     WHERE id=?
                 """, (
-                    row['category'], row['manufacturer'], float(row['price']), int(row['stock']),
+                    name_norm, row['category'], row['manufacturer'], float(row['price']), int(row['stock']),
                     req_rx, row['description'], row['indications'],
                     row['generic_equivalent'], row['contraindications'], existing['id']
                 ))
@@ -87,12 +91,12 @@ def seed_medicines():
                 # Insert new
                 cur.execute("""
                     INSERT INTO medicines (
-                        name, category, manufacturer, price, stock, 
+                        name, name_norm, category, manufacturer, price, stock, 
                         requires_prescription, description, indications, 
                         generic_equivalent, contraindications, created_at, updated_at
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
                 """, (
-                    row['name'], row['category'], row['manufacturer'], float(row['price']), int(row['stock']),
+                    row['name'], name_norm, row['category'], row['manufacturer'], float(row['price']), int(row['stock']),
                     req_rx, row['description'], row['indications'],
                     row['generic_equivalent'], row['contraindications']
                 ))
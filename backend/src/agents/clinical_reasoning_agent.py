@@ -8,7 +8,7 @@ import json
 from typing import Dict, Any
 from src.state import PharmacyState
 from src.clinical_models import ClinicalResponse, ClinicalContext
-from src.prompts.clinical_reasoning_v2 import CLINICAL_SYSTEM_PROMPT
+from src.prompts.clinical_reasoning_v2 import render_clinical_system_prompt
 from src.services.llm_service import call_llm
 from src.database import Database
 from src.services.contraindication_service import ContraindicationService
@@ -99,7 +99,7 @@ def clinical_reasoning_agent(state: PharmacyState) -> PharmacyState:
     # THEN pass to LLM.
     
     # Format the prompt
-    system_prompt = CLINICAL_SYSTEM_PROMPT.format(
+    system_prompt = render_clinical_system_prompt(
         clinical_context=state.clinical_context.model_dump_json(indent=2),
         contraindications="To be verified against LLM recommendation.",
         interactions="To be verified against LLM recommendation.",
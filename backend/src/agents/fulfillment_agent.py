@@ -29,6 +29,7 @@ from src.errors import (
     DatabaseError,
     ConfirmationRequiredError,
 )
+from src.agents.risk_scoring_agent import flush_patient_updates
 from src.events.event_bus import get_event_bus
 from src.events.event_types import OrderCreatedEvent, OrderFailedEvent
 from src.services.observability_service import trace_agent, trace_tool_call
@@ -46,6 +47,9 @@ def fulfillment_agent(state: PharmacyState) -> PharmacyState:
     
     # Step 0: HARD CONFIRMATION GATE
     if not state.confirmation_confirmed:
+        # The turn ends here until the patient says YES, so persist_patient
+        # never runs: write the risk profile changes queued so far first
+        flush_patient_updates(state)
         raise ConfirmationRequiredError(session_id=state.session_id or "")
 
     # Initialize reasoning trace
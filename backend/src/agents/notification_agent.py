@@ -14,6 +14,7 @@ Responsibilities:
 from typing import Dict, List, Any, Optional
 from datetime import datetime
 import json
+import os
 from pathlib import Path
 
 from src.state import PharmacyState
@@ -247,6 +248,12 @@ def notification_agent(state: PharmacyState) -> PharmacyState:
 # ------------------------------------------------------------------
 # HELPER FUNCTIONS
 # ------------------------------------------------------------------
+
+# Resolved once at import; created on the first write rather than per call
+NOTIFICATION_LOG_DIR = Path(os.getcwd()) / "logs"
+_log_dir_created = False
+
+
 def log_notifications_to_file(state: PharmacyState, notifications: List[Dict[str, Any]]):
     """
     Log notifications to a file for audit purposes.
@@ -255,14 +262,13 @@ def log_notifications_to_file(state: PharmacyState, notifications: List[Dict[str
         state: Pharmacy state
         notifications: List of notification dictionaries
     """
-    # Create logs directory if it doesn't exist
-    # Use absolute path from current working directory
-    import os
-    log_dir = Path(os.getcwd()) / "logs"
-    log_dir.mkdir(parents=True, exist_ok=True)
+    global _log_dir_created
+    if not _log_dir_created:
+        NOTIFICATION_LOG_DIR.mkdir(parents=True, exist_ok=True)
+        _log_dir_created = True
     
     # Create log file path (one file per day)
-    log_file = log_dir / f"notifications_{datetime.now().strftime('%Y-%m-%d')}.jsonl"
+    log_file = NOTIFICATION_LOG_DIR / f"notifications_{datetime.now().strftime('%Y-%m-%d')}.jsonl"
     
     # Prepare log entry
     log_entry = {
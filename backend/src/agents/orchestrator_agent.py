@@ -63,7 +63,7 @@ class OrchestratorAgent:
                 "dominant_mode": state.dominant_mode,
                 "pipeline_phase": state.pipeline_phase,
                 "alert_level": state.alert_level,
-                "contributing_scores": state.contributing_scores,
+                "contributing_scores": dict(state.contributing_scores),
                 "halt_reason": state.halt_reason
             },
             "parent_id": None
@@ -23,14 +23,23 @@ Risk Levels:
 """
 
 import logging
+import re
 from datetime import datetime
+from functools import lru_cache
 from typing import Dict, List, Any, Optional
+from sqlalchemy import select, update
 from src.state import PharmacyState
 from src.db_config import get_db_context
 from src.models import Patient
 
 logger = logging.getLogger(__name__)
 
+try:
+    import ahocorasick
+    HAS_AHOCORASICK = True
+except ImportError:
+    HAS_AHOCORASICK = False
+
 # Medicines with known abuse potential
 CONTROLLED_SUBSTANCES = [
     "diazepam", "alprazolam", "clonazepam", "lorazepam", "midazolam",  # Benzos
@@ -45,6 +54,64 @@ ABUSE_POTENTIAL_MEDICINES = [
     "pseudoephedrine", "dextromethorphan",
 ]
 
+# Exact-name lookups for canonical single-token names
+CONTROLLED_SET = frozenset(CONTROLLED_SUBSTANCES)
+ABUSE_SET = frozenset(ABUSE_POTENTIAL_MEDICINES)
+
+# Single-pass matchers used when pyahocorasick is unavailable
+CONTROLLED_RE = re.compile("|".join(map(re.escape, CONTROLLED_SUBSTANCES)))
+ABUSE_RE = re.compile("|".join(map(re.escape, ABUSE_POTENTIAL_MEDICINES)))
+
+
+def _build_substance_automaton():
+    """
+    Compile CONTROLLED_SUBSTANCES and ABUSE_POTENTIAL_MEDICINES into one
+    Aho-Corasick automaton so each medicine name is scanned in a single pass.
+    Returns None when pyahocorasick is not installed.
+    """
+    if not HAS_AHOCORASICK:
+        return None
+    automaton = ahocorasick.Automaton()
+    for term in ABUSE_POTENTIAL_MEDICINES:
+        automaton.add_word(term, ("abuse", term))
+    for term in CONTROLLED_SUBSTANCES:
+        automaton.add_word(term, ("controlled", term))
+    automaton.make_automaton()
+    return automaton
+
+
+_SUBSTANCE_AUTOMATON = _build_substance_automaton()
+
+
+@lru_cache(maxsize=2048)
+def _classify_medicine(name_lower: str) -> Optional[str]:
+    """
+    Classify a lowercased medicine name (memoized per distinct name).
+    Returns "controlled", "abuse" or None. Controlled substances win over
+    abuse-potential matches, same as the original elif ordering.
+    """
+    # Fast path: whole name or one of its tokens is a known term. An exact
+    # abuse-potential name cannot also contain a controlled term.
+    if name_lower in CONTROLLED_SET or any(tok in CONTROLLED_SET for tok in name_lower.split()):
+        return "controlled"
+    if name_lower in ABUSE_SET:
+        return "abuse"
+
+    if _SUBSTANCE_AUTOMATON is not None:
+        kind = None
+        for _, (match_kind, _term) in _SUBSTANCE_AUTOMATON.iter(name_lower):
+            if match_kind == "controlled":
+                return "controlled"
+            kind = match_kind
+        return kind
+
+    if CONTROLLED_RE.search(name_lower):
+        return "controlled"
+    if ABUSE_RE.search(name_lower):
+        return "abuse"
+    return None
+
+
 RISK_WEIGHTS = {
     "prescription_without_upload": 30,
     "controlled_substance_request": 40,
@@ -64,21 +131,29 @@ RISK_LEVELS = {
 }
 
 
+# Risk level for every score 0-100, derived from RISK_LEVELS
+_RISK_LEVEL_BY_SCORE = tuple(
+    next(level for level, (_, upper) in RISK_LEVELS.items() if score <= upper)
+    for score in range(101)
+)
+
+
 def calculate_risk_level(score: int) -> str:
-    if score <= 30:
-        return "normal"
-    elif score <= 60:
-        return "elevated"
-    elif score <= 80:
-        return "high"
-    else:
-        return "critical"
+    return _RISK_LEVEL_BY_SCORE[min(max(score, 0), 100)]
 
 
-def assess_request_risk(state: PharmacyState) -> Dict[str, Any]:
+def assess_request_risk(
+    state: PharmacyState,
+    now_iso: Optional[str] = None,
+    old_score: Optional[int] = None,
+) -> Dict[str, Any]:
     """
     Assess risk for current request. Returns risk factors and score delta.
     Does NOT modify state or database — pure assessment.
+
+    now_iso lets the caller share one timestamp across the whole turn.
+    When old_score is given, the item scan stops as soon as the cumulative
+    score reaches the 100 cap and a "score_capped" factor is recorded.
     """
     factors_triggered = []
     score_delta = 0
@@ -88,16 +163,16 @@ def assess_request_risk(state: PharmacyState) -> Dict[str, Any]:
     # Check each medicine in the request
     controlled_count = 0
     for item in items:
-        name_lower = item.medicine_name.lower()
+        kind = _classify_medicine(item.medicine_name_lower)
         
         # Controlled substance check
-        if any(cs in name_lower for cs in CONTROLLED_SUBSTANCES):
+        if kind == "controlled":
             factors_triggered.append(f"controlled_substance:{item.medicine_name}")
             score_delta += RISK_WEIGHTS["controlled_substance_request"]
             controlled_count += 1
         
         # Abuse potential check
-        elif any(ap in name_lower for ap in ABUSE_POTENTIAL_MEDICINES):
+        elif kind == "abuse":
             factors_triggered.append(f"abuse_potential:{item.medicine_name}")
             score_delta += RISK_WEIGHTS["abuse_potential_medicine"]
         
@@ -110,6 +185,11 @@ def assess_request_risk(state: PharmacyState) -> Dict[str, Any]:
         if item.requires_prescription and not state.prescription_uploaded:
             factors_triggered.append(f"prescription_missing:{item.medicine_name}")
             score_delta += RISK_WEIGHTS["prescription_without_upload"]
+        
+        # Already critical at the cap — remaining items cannot change the outcome
+        if old_score is not None and old_score + score_delta >= 100:
+            factors_triggered.append("score_capped")
+            break
     
     # Multiple controlled substances
     if controlled_count >= 2:
@@ -124,7 +204,7 @@ def assess_request_risk(state: PharmacyState) -> Dict[str, Any]:
     return {
         "factors_triggered": factors_triggered,
         "score_delta": score_delta,
-        "assessment_timestamp": datetime.now().isoformat()
+        "assessment_timestamp": now_iso or datetime.now().isoformat()
     }
 
 
@@ -141,47 +221,73 @@ def run_risk_scoring_agent(state: PharmacyState) -> PharmacyState:
         logger.warning("Risk scoring skipped — no user_id")
         return state
     
-    # Step 1: Assess current request
-    assessment = assess_request_risk(state)
+    # One timestamp for the assessment, patient update and trace
+    now = datetime.now()
+    now_iso = now.isoformat()
+    
+    # Fast path: no items and no rejection means score_delta is 0 — skip the DB
+    if not state.extracted_items and state.pharmacist_decision != "rejected":
+        state.risk_factors_triggered = []
+        state.risk_escalated = False
+        state.trace_metadata["risk_scoring_agent"] = {
+            "risk_score": state.risk_score,
+            "risk_level": state.risk_level,
+            "score_delta": 0,
+            "factors_triggered": [],
+            "escalated": False,
+            "pipeline_action": "skipped_no_items",
+            "timestamp": now_iso
+        }
+        print("⚪ No items to assess — skipped")
+        print(f"{'='*50}\n")
+        return state
+    
+    # Step 1: Load patient risk profile
+    # Narrow projection: only the columns the assessment needs, no ORM hydration
+    with get_db_context() as db:
+        profile = db.execute(
+            select(Patient.risk_score, Patient.risk_flags)
+            .where(Patient.user_id == state.user_id)  # Using user_id (PID), not pid
+        ).first()
+    
+    if profile is None:
+        logger.warning(f"Patient {state.user_id} not found for risk scoring")
+        return state
+    
+    old_score = profile.risk_score or 0
+    existing_flags = profile.risk_flags or []
+    
+    # Step 2: Assess current request (stops early once the score caps)
+    assessment = assess_request_risk(state, now_iso=now_iso, old_score=old_score)
     score_delta = assessment["score_delta"]
     new_factors = assessment["factors_triggered"]
     
     print(f"Score delta: +{score_delta}")
     print(f"Factors: {new_factors}")
     
-    # Step 2: Load and update patient risk profile
-    with get_db_context() as db:
-        patient = db.query(Patient).filter(
-            Patient.user_id == state.user_id # Using user_id (PID), not pid
-        ).first()
-        
-        if not patient:
-            logger.warning(f"Patient {state.user_id} not found for risk scoring")
-            return state
-        
-        # Accumulate risk score (cap at 100)
-        old_score = patient.risk_score or 0
-        new_score = min(100, old_score + score_delta)
-        
-        # Merge risk flags
-        existing_flags = patient.risk_flags or []
-        all_flags = list(set(existing_flags + new_factors))
-        
-        new_level = calculate_risk_level(new_score)
-        escalated = new_level in ["high", "critical"] and \
-                    calculate_risk_level(old_score) not in ["high", "critical"]
-        
-        # Update patient
-        patient.risk_score = new_score
-        patient.risk_level = new_level
-        patient.risk_flags = all_flags
-        patient.risk_updated_at = datetime.now()
-        patient.flagged_for_review = new_level in ["high", "critical"]
-        db.commit()
-        
-        print(f"Risk: {old_score} → {new_score} ({new_level.upper()})")
-        if escalated:
-            print(f"⚠️  ESCALATED to {new_level.upper()}")
+    # Accumulate risk score (cap at 100)
+    new_score = min(100, old_score + score_delta)
+    
+    # Merge risk flags (order-preserving, so unchanged flags compare equal)
+    all_flags = list(dict.fromkeys((*existing_flags, *new_factors)))
+    
+    new_level = calculate_risk_level(new_score)
+    escalated = new_level in ["high", "critical"] and \
+                calculate_risk_level(old_score) not in ["high", "critical"]
+    
+    # Defer the patient UPDATE to flush_patient_updates() at pipeline end
+    state.pending_patient_updates.update({
+        "risk_score": new_score,
+        "risk_level": new_level,
+        "risk_updated_at": now,
+        "flagged_for_review": new_level in ["high", "critical"],
+    })
+    if all_flags != existing_flags:
+        state.pending_patient_updates["risk_flags"] = all_flags
+    
+    print(f"Risk: {old_score} → {new_score} ({new_level.upper()})")
+    if escalated:
+        print(f"⚠️  ESCALATED to {new_level.upper()}")
     
     # Step 3: Update state
     state.risk_score = new_score
@@ -229,8 +335,29 @@ def run_risk_scoring_agent(state: PharmacyState) -> PharmacyState:
                           else "review" if new_level == "high"
                           else "monitor" if new_level == "elevated"
                           else "normal",
-        "timestamp": datetime.now().isoformat()
+        "timestamp": now_iso
     }
     
     print(f"{'='*50}\n")
     return state
+
+
+def flush_patient_updates(state: PharmacyState) -> PharmacyState:
+    """
+    Terminal pipeline step. Persists every patient column change queued on
+    state.pending_patient_updates during the turn as a single UPDATE and
+    one COMMIT.
+    """
+    if not state.user_id or not state.pending_patient_updates:
+        return state
+
+    with get_db_context() as db:
+        db.execute(
+            update(Patient)
+            .where(Patient.user_id == state.user_id)
+            .values(**state.pending_patient_updates)
+        )
+        db.commit()
+
+    state.pending_patient_updates = {}
+    return state
@@ -15,7 +15,9 @@ Architecture:
 - Emergency override for critical symptoms
 """
 
-from typing import Dict, List, Optional
+import re
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional
 from src.services.llm_service import parse_structured
 import logging
 
@@ -36,6 +38,9 @@ EMERGENCY_RED_FLAGS = [
     "choking"
 ]
 
+# All red flags compiled into one alternation — a single scan per text
+EMERGENCY_RE = re.compile("|".join(re.escape(flag) for flag in EMERGENCY_RED_FLAGS))
+
 # Severity thresholds for deterministic routing
 SEVERITY_THRESHOLDS = {
     "OTC_RECOMMENDATION": (1, 3),      # 1-3: Mild, self-limiting
@@ -44,6 +49,12 @@ SEVERITY_THRESHOLDS = {
     "EMERGENCY_ALERT": (9, 10)        # 9-10: Critical, emergency care
 }
 
+# Route for every severity score 0-10, derived from SEVERITY_THRESHOLDS
+_ROUTE_BY_SEVERITY = tuple(
+    next(route for route, (_, upper) in SEVERITY_THRESHOLDS.items() if score <= upper)
+    for score in range(11)
+)
+
 
 def assess_severity(
     symptoms: str,
@@ -71,6 +82,23 @@ def assess_severity(
         }
     """
     
+    # Step 0: Deterministic emergency match — the override below would fire
+    # regardless of the AI score, so skip the LLM round trip entirely.
+    early_flag = _check_emergency_red_flags(symptoms, [])
+    if early_flag:
+        logger.warning(f"Emergency red flag in symptoms, skipping AI assessment: {early_flag}")
+        return {
+            "severity_score": 9,
+            "risk_level": "critical",
+            "red_flags_detected": [early_flag],
+            "recommended_action": "emergency",
+            "confidence": 1.0,
+            "reasoning": "Deterministic emergency red flag match",
+            "route": _determine_route(9),
+            "emergency_override": True,
+            "routing_logic": "deterministic_threshold"
+        }
+    
     # Step 1: Get AI severity assessment
     ai_assessment = _get_ai_severity_score(symptoms, patient_context, conversation_history)
     
@@ -112,28 +140,29 @@ def _get_ai_severity_score(
     """
     
     # Build context
-    context_str = f"Symptoms: {symptoms}\n"
+    parts = [f"Symptoms: {symptoms}\n"]
     
     if patient_context.get("age"):
-        context_str += f"Age: {patient_context['age']}\n"
+        parts.append(f"Age: {patient_context['age']}\n")
     
     if patient_context.get("allergies"):
-        context_str += f"Allergies: {', '.join(patient_context['allergies'])}\n"
+        parts.append(f"Allergies: {', '.join(patient_context['allergies'])}\n")
     
     if patient_context.get("existing_conditions"):
-        context_str += f"Conditions: {', '.join(patient_context['existing_conditions'])}\n"
+        parts.append(f"Conditions: {', '.join(patient_context['existing_conditions'])}\n")
     
     if patient_context.get("symptom_duration"):
-        context_str += f"Duration: {patient_context['symptom_duration']}\n"
+        parts.append(f"Duration: {patient_context['symptom_duration']}\n")
     
     # Add conversation history for context
     if conversation_history:
-        recent_messages = conversation_history[-5:]  # Last 5 messages
-        context_str += "\nConversation:\n"
-        for msg in recent_messages:
+        parts.append("\nConversation:\n")
+        for msg in conversation_history[-5:]:  # Last 5 messages
             role = msg.get("role", "user")
             content = msg.get("content", "")
-            context_str += f"{role}: {content}\n"
+            parts.append(f"{role}: {content}\n")
+    
+    context_str = "".join(parts)
     
     # System instruction for severity scoring
     prompt = f"""You are a clinical triage assistant. Given user symptoms, analyze severity and return ONLY valid JSON in the following format:
@@ -218,19 +247,15 @@ def _check_emergency_red_flags(symptoms: str, ai_red_flags: List[str]) -> Option
     
     Returns the first emergency flag found, or None.
     """
-    symptoms_lower = symptoms.lower()
-    
     # Check symptoms text
-    for flag in EMERGENCY_RED_FLAGS:
-        if flag in symptoms_lower:
-            return flag
+    match = EMERGENCY_RE.search(symptoms.lower())
+    if match:
+        return match.group(0)
     
     # Check AI-detected red flags
     for ai_flag in ai_red_flags:
-        ai_flag_lower = ai_flag.lower()
-        for emergency_flag in EMERGENCY_RED_FLAGS:
-            if emergency_flag in ai_flag_lower:
-                return ai_flag
+        if EMERGENCY_RE.search(ai_flag.lower()):
+            return ai_flag
     
     return None
 
@@ -241,14 +266,7 @@ def _determine_route(severity_score: int) -> str:
     
     AI cannot override these thresholds.
     """
-    if severity_score <= 3:
-        return "OTC_RECOMMENDATION"
-    elif severity_score <= 6:
-        return "PHARMACIST_CONSULT"
-    elif severity_score <= 8:
-        return "DOCTOR_REFERRAL"
-    else:
-        return "EMERGENCY_ALERT"
+    return _ROUTE_BY_SEVERITY[min(max(severity_score, 0), 10)]
 
 
 def _get_default_assessment() -> Dict:
@@ -267,40 +285,44 @@ def _get_default_assessment() -> Dict:
     }
 
 
-def get_urgency_display(severity_score: int, risk_level: str) -> Dict:
+# UI urgency indicators, one per severity bucket (1-3, 4-6, 7-8, 9-10).
+# Built once and shared read-only across calls.
+_URGENCY_DISPLAY = (
+    MappingProxyType({
+        "badge_color": "green",
+        "badge_text": "Low Risk",
+        "icon": "✓",
+        "description": "Mild symptoms - OTC medication recommended"
+    }),
+    MappingProxyType({
+        "badge_color": "orange",
+        "badge_text": "Moderate",
+        "icon": "⚠",
+        "description": "Moderate symptoms - Pharmacist consultation recommended"
+    }),
+    MappingProxyType({
+        "badge_color": "red",
+        "badge_text": "High Risk",
+        "icon": "⚠⚠",
+        "description": "Serious symptoms - Doctor consultation required"
+    }),
+    MappingProxyType({
+        "badge_color": "red-flashing",
+        "badge_text": "EMERGENCY",
+        "icon": "🚨",
+        "description": "Critical symptoms - Seek emergency care immediately"
+    }),
+)
+
+
+def get_urgency_display(severity_score: int, risk_level: str) -> Mapping[str, str]:
     """
     Get UI display information for urgency indicator.
     
-    Returns badge color, text, and icon.
+    Returns badge color, text, and icon (read-only mapping).
     """
-    if severity_score <= 3:
-        return {
-            "badge_color": "green",
-            "badge_text": "Low Risk",
-            "icon": "✓",
-            "description": "Mild symptoms - OTC medication recommended"
-        }
-    elif severity_score <= 6:
-        return {
-            "badge_color": "orange",
-            "badge_text": "Moderate",
-            "icon": "⚠",
-            "description": "Moderate symptoms - Pharmacist consultation recommended"
-        }
-    elif severity_score <= 8:
-        return {
-            "badge_color": "red",
-            "badge_text": "High Risk",
-            "icon": "⚠⚠",
-            "description": "Serious symptoms - Doctor consultation required"
-        }
-    else:
-        return {
-            "badge_color": "red-flashing",
-            "badge_text": "EMERGENCY",
-            "icon": "🚨",
-            "description": "Critical symptoms - Seek emergency care immediately"
-        }
+    s = severity_score
+    return _URGENCY_DISPLAY[0 if s <= 3 else 1 if s <= 6 else 2 if s <= 8 else 3]
 
 
 def format_severity_report(assessment: Dict) -> str:
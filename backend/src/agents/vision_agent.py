@@ -5,14 +5,91 @@ Extracts structured data from prescription images using Gemini Vision.
 """
 
 import base64
+import copy
+import hashlib
+import io
 from typing import Dict, List, Any, Optional
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, Field
 import json
 import os
+import re
+
+import orjson
+
+from src.utils.ttl_cache import TTLCache, MISS
+
+# Shared Gemini client — one connection pool for every VisionAgent instance
+_client = None
+
+
+def _get_client():
+    """Get or initialize the shared Gemini vision client."""
+    global _client
+
+    if _client is None:
+        from google import genai
+        vision_api_key = os.getenv('GEMINI_VISION_API_KEY') or os.getenv('GEMINI_API_KEY')
+        _client = genai.Client(api_key=vision_api_key)
+
+    return _client
+
+
+# Gemini gains nothing for OCR beyond ~1568px per side; larger uploads are
+# downscaled before sending.
+MAX_UPLOAD_SIDE = 1568
+DOWNSCALE_THRESHOLD_BYTES = 1_000_000
+
+
+def _downscale_for_upload(image_bytes: bytes) -> bytes:
+    """
+    Shrink large prescription photos to a JPEG no bigger than
+    MAX_UPLOAD_SIDE per side. Small or undecodable images are returned as-is.
+    """
+    if len(image_bytes) <= DOWNSCALE_THRESHOLD_BYTES:
+        return image_bytes
+
+    try:
+        from PIL import Image, ImageOps
+
+        img = Image.open(io.BytesIO(image_bytes))
+        img = ImageOps.exif_transpose(img)
+        img.thumbnail((MAX_UPLOAD_SIDE, MAX_UPLOAD_SIDE), Image.Resampling.LANCZOS)
+        if img.mode != "RGB":
+            img = img.convert("RGB")
+
+        buf = io.BytesIO()
+        img.save(buf, "JPEG", quality=85, optimize=True)
+        return buf.getvalue()
+    except Exception:
+        return image_bytes
+
+
+# Content-hash cache of successful extractions, so re-uploads of the same
+# prescription (retry, refresh) skip the Gemini call.
+EXTRACTION_CACHE_SIZE = 256
+EXTRACTION_CACHE_TTL_SECONDS = 24 * 60 * 60
+
+_extraction_cache = TTLCache(maxsize=EXTRACTION_CACHE_SIZE, ttl_seconds=EXTRACTION_CACHE_TTL_SECONDS)
+
+
+def _get_cached_extraction(key: str) -> Optional[Dict[str, Any]]:
+    result = _extraction_cache.get(key)
+    # Callers may edit the result, so hand out a copy of the cached dict
+    return None if result is MISS else copy.deepcopy(result)
+
+
+def _store_cached_extraction(key: str, result: Dict[str, Any]) -> None:
+    _extraction_cache.set(key, copy.deepcopy(result))
+
+
+# Leading ```/```json and trailing ``` fences around a JSON payload
+_MARKDOWN_FENCE_RE = re.compile(r"\A```(?:json)?\s*|\s*```\Z")
 
 
 class MedicineItem(BaseModel):
     """Single medicine from prescription."""
+    model_config = ConfigDict(extra="ignore")
+
     name: str
     dosage: Optional[str] = None
     frequency: Optional[str] = None
@@ -22,10 +99,12 @@ class MedicineItem(BaseModel):
 
 class PrescriptionData(BaseModel):
     """Structured prescription data."""
+    model_config = ConfigDict(extra="ignore")
+
     patient_name: Optional[str] = None
     doctor_name: Optional[str] = None
     date: Optional[str] = None
-    medicines: List[MedicineItem] = []
+    medicines: List[MedicineItem] = Field(default_factory=list)  # no schema default; Gemini rejects it
     special_instructions: Optional[str] = None
     diagnosis: Optional[str] = None
 
@@ -43,8 +122,7 @@ class VisionAgent:
         try:
             from google import genai
             self.genai = genai
-            vision_api_key = os.getenv('GEMINI_VISION_API_KEY') or os.getenv('GEMINI_API_KEY')
-            self.client = genai.Client(api_key=vision_api_key)
+            self.client = _get_client()
         except ImportError:
             self.genai = None
             self.client = None
@@ -65,6 +143,11 @@ class VisionAgent:
                 "error": "google-genai SDK not installed or GEMINI_API_KEY missing"
             }
 
+        cache_key = hashlib.blake2b(image_bytes, digest_size=32).hexdigest()
+        cached = _get_cached_extraction(cache_key)
+        if cached is not None:
+            return cached
+
         try:
             prompt = """
 You are a medical prescription OCR expert. Analyze this prescription image and extract ALL information in JSON format.
@@ -112,39 +195,40 @@ Example format:
             response = self.client.models.generate_content(
                 model=model_name,
                 contents=[
-                    types.Part.from_bytes(data=image_bytes, mime_type="image/jpeg"),
+                    types.Part.from_bytes(
+                        data=_downscale_for_upload(image_bytes),
+                        mime_type="image/jpeg",
+                    ),
                     prompt,
                 ],
                 config=types.GenerateContentConfig(
                     temperature=0.1,
-                    response_mime_type="application/json"
+                    response_mime_type="application/json",
+                    response_schema=PrescriptionData,
                 )
             )
             
-            # Parse JSON response
-            response_text = response.text.strip()
+            response_text = response.text
             
-            # Remove markdown code blocks if present
-            if response_text.startswith("```json"):
-                response_text = response_text[7:]
-            if response_text.startswith("```"):
-                response_text = response_text[3:]
-            if response_text.endswith("```"):
-                response_text = response_text[:-3]
+            # The SDK parses schema-constrained output straight into the model
+            prescription = response.parsed
+            if not isinstance(prescription, PrescriptionData):
+                # Fallback: parse the raw text, removing markdown code fences if present
+                response_text = _MARKDOWN_FENCE_RE.sub("", response_text.strip())
+                
+                # Parse JSON (orjson.JSONDecodeError subclasses json.JSONDecodeError)
+                data = orjson.loads(response_text)
+                
+                # Validate with Pydantic (compiled pydantic-core validator)
+                prescription = PrescriptionData.model_validate(data)
             
-            response_text = response_text.strip()
-            
-            # Parse JSON
-            data = json.loads(response_text)
-            
-            # Validate with Pydantic
-            prescription = PrescriptionData(**data)
-            
-            return {
+            result = {
                 "success": True,
-                "data": prescription.model_dump() if hasattr(prescription, 'model_dump') else prescription.dict(),
+                "data": prescription.model_dump(),
                 "raw_response": response_text
             }
+            _store_cached_extraction(cache_key, result)
+            return result
             
         except json.JSONDecodeError as e:
             return {
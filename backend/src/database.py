@@ -7,18 +7,187 @@ Works with both SQLite (dev) and PostgreSQL/Supabase (prod).
 Includes transaction support for atomic operations.
 """
 
-from typing import List, Optional, Dict
+import logging
+import math
+import uuid
+from typing import List, Optional, Dict, Tuple
 from contextlib import contextmanager
-from sqlalchemy.orm import Session
+from sqlalchemy import func, insert, literal, select, update
+from sqlalchemy.orm import Session, selectinload
 from sqlalchemy.exc import SQLAlchemyError
 from collections import defaultdict
 
 from datetime import datetime
-from src.models import Medicine, Order, OrderItem as DBOrderItem, AuditLog, SymptomMedicineMapping, Patient
+from src.models import Medicine, Order, OrderItem as DBOrderItem, AuditLog, SymptomMedicineMapping, Patient, normalize_medicine_name
 from src.state import OrderItem
-from src.db_config import get_db_context
+from src.db_config import get_db_context, is_postgres
 from src.errors import DatabaseError, TransactionError
 from src.services.semantic_search_service import semantic_search_service
+from src.utils.ttl_cache import TTLCache, MISS
+
+try:
+    from rapidfuzz import process as rf_process
+    from rapidfuzz.distance import Levenshtein
+    HAS_RAPIDFUZZ = True
+except ImportError:
+    HAS_RAPIDFUZZ = False
+
+logger = logging.getLogger(__name__)
+
+# Minimum normalized Levenshtein similarity for a typo match
+SIMILARITY_THRESHOLD = 0.7
+
+# Size of the pg_trgm shortlist re-ranked by Levenshtein on PostgreSQL
+TRIGRAM_CANDIDATES = 10
+
+# get_medicine results keyed by normalized name. The short TTL bounds how
+# stale a cached stock figure can get; local mutations invalidate at once.
+_medicine_cache = TTLCache(maxsize=4096, ttl_seconds=30)
+
+
+# (id, lowercased name) snapshot of the medicines table for the typo scan.
+# "ver" is (_names_version, row count, max id): the counter moves on local
+# name writes, the primary-key probe catches rows added or removed by other
+# processes. None forces a reload.
+_names_version = 0
+_NAME_CACHE: Dict = {"ver": None, "ids": [], "names": []}
+
+
+def invalidate_medicine_cache(names: bool = True) -> None:
+    """
+    Drop all cached get_medicine results (call after any medicine write).
+    
+    Stock-only writes pass names=False so the typo name index is kept.
+    """
+    global _names_version
+    _medicine_cache.clear()
+    if names:
+        _names_version += 1
+
+
+def _refresh_name_cache(session: Session) -> Dict:
+    """
+    Return the cached name index, reloading it only if the names changed.
+    
+    The version probe reads only the primary-key index; the full (id, name)
+    list is re-read only when rows were added, removed or renamed.
+    """
+    global _NAME_CACHE
+    cache = _NAME_CACHE
+    ver = (_names_version, *session.execute(
+        select(func.count(Medicine.id), func.max(Medicine.id))
+    ).one())
+    if cache["ver"] != ver:
+        rows = session.execute(
+            select(Medicine.id, Medicine.name).order_by(Medicine.id)
+        ).all()
+        # Swap in a fresh dict so concurrent readers never see a half-built index
+        cache = {
+            "ver": ver,
+            "ids": [row[0] for row in rows],
+            "names": [row[1].lower() for row in rows],
+        }
+        _NAME_CACHE = cache
+    return cache
+
+
+# Columns exposed in every medicine dict returned by the lookups below
+_MED_COLS = (
+    "id", "name", "category", "manufacturer", "price", "stock",
+    "requires_prescription", "description", "indications",
+    "generic_equivalent", "dosage_form", "strength",
+    "active_ingredients", "side_effects",
+)
+
+
+def _medicine_to_dict(medicine: Medicine, **extras) -> Dict:
+    """Serialize a Medicine row to the standard lookup dict, plus extras."""
+    return {col: getattr(medicine, col) for col in _MED_COLS} | extras
+
+
+def _medicines_by_name(session: Session, items: List[OrderItem]) -> Dict[str, Medicine]:
+    """
+    Resolve every order item's medicine in one IN query.
+    
+    Returns:
+        Dict mapping normalized medicine name to its Medicine row
+    """
+    names = {normalize_medicine_name(item.medicine_name) for item in items}
+    if not names:
+        return {}
+    rows = session.query(Medicine).filter(
+        Medicine.name_norm.in_(names)
+    ).order_by(Medicine.id).all()
+    by_name: Dict[str, Medicine] = {}
+    for row in rows:
+        by_name.setdefault(row.name_norm, row)
+    return by_name
+
+
+def _decrement_stock_stmt(name: str, qty: int):
+    """
+    Single-statement stock decrement for the medicine named name.
+    
+    Targets the lowest-id row with that name (the one lookups resolve to)
+    and only matches while enough stock remains, so a rowcount of 1 means
+    the decrement happened atomically.
+    """
+    first_id = (
+        select(func.min(Medicine.id))
+        .where(Medicine.name_norm == normalize_medicine_name(name))
+        .scalar_subquery()
+    )
+    return (
+        update(Medicine)
+        .where(Medicine.id == first_id, Medicine.stock >= qty)
+        .values(stock=Medicine.stock - qty)
+        # Loaded rows are expired on commit; no need to re-select them here
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _order_item_rows(order_pk: int, items: List[OrderItem], medicines: Dict[str, Medicine]) -> List[Dict]:
+    """Build order_items insert mappings for every item whose medicine resolved."""
+    rows = []
+    for item in items:
+        medicine = medicines.get(normalize_medicine_name(item.medicine_name))
+        if medicine:
+            rows.append({
+                "order_id": order_pk,
+                "medicine_id": medicine.id,
+                "medicine_name": medicine.name,
+                "dosage": item.dosage,
+                "quantity": item.quantity,
+                "price": medicine.price,
+            })
+    return rows
+
+
+def _audit_log_insert_stmt(
+    order_id: str,
+    agent_name: str,
+    decision: str,
+    reasoning: str,
+    confidence_score: Optional[float],
+    extra_data: Optional[Dict],
+):
+    """
+    INSERT ... SELECT that resolves the order's primary key in the same
+    statement. Inserts nothing (rowcount 0) when order_id is unknown.
+    """
+    cols = AuditLog.__table__.c
+    values = {
+        "agent_name": agent_name,
+        "decision": decision,
+        "reasoning": reasoning,
+        "confidence_score": confidence_score,
+        "extra_data": extra_data or {},
+    }
+    source = select(
+        Order.id,
+        *(literal(value, type_=cols[name].type) for name, value in values.items()),
+    ).where(Order.order_id == order_id)
+    return insert(AuditLog).from_select(["order_id", *values], source)
 
 
 class Database:
@@ -54,6 +223,8 @@ class Database:
             try:
                 yield tx
                 session.commit()
+                # Stock may have changed; drop reads cached before the commit
+                invalidate_medicine_cache(names=False)
             except Exception as e:
                 session.rollback()
                 raise TransactionError(
@@ -65,102 +236,170 @@ class Database:
         """
         Get medicine by name with fuzzy matching.
         
+        Results are cached briefly per normalized name; callers get their
+        own copy of the dict.
+        
         Args:
             name: Medicine name (case-insensitive, handles typos)
             
         Returns:
             Medicine dict or None if not found
         """
-        print(f"DATABASE: Getting medicine: {name}")
+        name = name.strip()
+        key = normalize_medicine_name(name)
+        medicine = _medicine_cache.get(key)
+        if medicine is MISS:
+            medicine = self._get_medicine_uncached(name)
+            _medicine_cache.set(key, medicine)
+        return dict(medicine) if medicine else None
+    
+    def _get_medicine_uncached(self, name: str) -> Optional[Dict]:
+        """Exact, partial and similarity lookup against the database."""
+        logger.debug("DATABASE: Getting medicine: %s", name)
         with get_db_context() as db:
-            print(f"DEBUG: get_medicine searching for: '{name}'")
             # Try exact match first
             medicine = db.query(Medicine).filter(
-                Medicine.name.ilike(name)
+                Medicine.name_norm == normalize_medicine_name(name)
             ).first()
             
             if medicine:
-                return {
-                    "medicine_id": medicine.id,
-                    "name": medicine.name,
-                    "category": medicine.category,
-                    "price": medicine.price,
-                    "stock": medicine.stock,
-                    "requires_prescription": medicine.requires_prescription,
-                    "description": medicine.description,
-                    "indications": medicine.indications,
-                    "generic_equivalent": medicine.generic_equivalent,
-                    "dosage_form": medicine.dosage_form,
-                    "strength": medicine.strength,
-                    "active_ingredients": medicine.active_ingredients,
-                    "side_effects": medicine.side_effects,
-                }
+                return _medicine_to_dict(medicine)
             
             # Try fuzzy match (partial match)
-            print(f"DATABASE: Exact match not found, trying fuzzy match...")
+            logger.debug("DATABASE: Exact match not found, trying fuzzy match...")
             medicine = db.query(Medicine).filter(
                 Medicine.name.ilike(f"%{name}%")
             ).first()
             
             if medicine:
-                print(f"DATABASE: Found fuzzy match: {medicine.name} (searched for: {name})")
-                return {
-                    "id": medicine.id,
-                    "name": medicine.name,
-                    "category": medicine.category,
-                    "manufacturer": medicine.manufacturer,
-                    "price": medicine.price,
-                    "stock": medicine.stock,
-                    "requires_prescription": medicine.requires_prescription,
-                    "description": medicine.description,
-                    "indications": medicine.indications,
-                    "generic_equivalent": medicine.generic_equivalent,
-                    "dosage_form": medicine.dosage_form,
-                    "strength": medicine.strength,
-                    "active_ingredients": medicine.active_ingredients,
-                    "side_effects": medicine.side_effects,
-                    "fuzzy_match": True,
-                    "searched_name": name,
-                }
+                logger.debug("DATABASE: Found fuzzy match: %s (searched for: %s)", medicine.name, name)
+                return _medicine_to_dict(medicine, fuzzy_match=True, searched_name=name)
             
             # Try Levenshtein distance for typos
-            print(f"DATABASE: Fuzzy match not found, trying similarity match...")
-            all_medicines = db.query(Medicine).all()
-            
-            best_match = None
+            logger.debug("DATABASE: Fuzzy match not found, trying similarity match...")
+            # Only (id, lowercased name) pairs are scored; the winner is loaded in full below
+            name_lower = name.lower()
+            min_len, max_len = _similarity_length_bounds(len(name))
+            if is_postgres():
+                # Index-backed pg_trgm shortlist instead of fetching every row
+                candidates = (
+                    select(Medicine.id, Medicine.name)
+                    .where(func.lower(Medicine.name).op("%")(name_lower))
+                    .order_by(func.similarity(func.lower(Medicine.name), name_lower).desc())
+                    .limit(TRIGRAM_CANDIDATES)
+                )
+                candidate_rows = [
+                    (med_id, med_name.lower())
+                    for med_id, med_name in db.execute(candidates)
+                ]
+            else:
+                # Scan the in-process name index; only names whose length
+                # can still reach the threshold are scored
+                name_cache = _refresh_name_cache(db)
+                candidate_rows = [
+                    (med_id, med_name)
+                    for med_id, med_name in zip(name_cache["ids"], name_cache["names"])
+                    if min_len <= len(med_name) <= max_len
+                ]
+            
+            best_id = None
             best_similarity = 0.0
             
-            for med in all_medicines:
-                similarity = calculate_similarity(name.lower(), med.name.lower())
-                if similarity > best_similarity and similarity >= 0.7:  # 70% similarity threshold
-                    best_similarity = similarity
-                    best_match = med
+            if HAS_RAPIDFUZZ and candidate_rows:
+                # One batched native call scores every candidate (multi-threaded)
+                scores = rf_process.cdist(
+                    [name_lower],
+                    [med_name for _, med_name in candidate_rows],
+                    scorer=Levenshtein.normalized_similarity,
+                    score_cutoff=SIMILARITY_THRESHOLD,
+                    workers=-1,
+                )[0]
+                index = int(scores.argmax())
+                if scores[index] >= SIMILARITY_THRESHOLD:
+                    best_similarity = float(scores[index])
+                    best_id = candidate_rows[index][0]
+            elif not HAS_RAPIDFUZZ:
+                for med_id, med_name in candidate_rows:
+                    # Distance is at least the length difference — skip hopeless candidates
+                    if not min_len <= len(med_name) <= max_len:
+                        continue
+                    # Largest distance that still meets the threshold for this pair
+                    longest = max(len(name_lower), len(med_name))
+                    k = math.floor((1.0 - SIMILARITY_THRESHOLD) * longest + 1e-9)
+                    distance = _bounded_levenshtein(name_lower, med_name, k)
+                    if distance > k:
+                        continue
+                    similarity = 1.0 - (distance / longest) if longest else 1.0
+                    if similarity > best_similarity and similarity >= SIMILARITY_THRESHOLD:
+                        best_similarity = similarity
+                        best_id = med_id
+            
+            best_match = db.get(Medicine, best_id) if best_id is not None else None
             
             if best_match:
-                print(f"DATABASE: Found similar match: {best_match.name} (similarity: {best_similarity:.2f})")
-                return {
-                    "id": best_match.id,
-                    "name": best_match.name,
-                    "category": best_match.category,
-                    "manufacturer": best_match.manufacturer,
-                    "price": best_match.price,
-                    "stock": best_match.stock,
-                    "requires_prescription": best_match.requires_prescription,
-                    "description": best_match.description,
-                    "indications": best_match.indications,
-                    "generic_equivalent": best_match.generic_equivalent,
-                    "dosage_form": best_match.dosage_form,
-                    "strength": best_match.strength,
-                    "active_ingredients": best_match.active_ingredients,
-                    "side_effects": best_match.side_effects,
-                    "fuzzy_match": True,
-                    "searched_name": name,
-                    "similarity": best_similarity,
-                }
-            
-            print(f"DATABASE: Medicine '{name}' not found (no exact or similarity matches)")
+                logger.debug(
+                    "DATABASE: Found similar match: %s (similarity: %.2f)",
+                    best_match.name, best_similarity,
+                )
+                return _medicine_to_dict(
+                    best_match,
+                    fuzzy_match=True,
+                    searched_name=name,
+                    similarity=best_similarity,
+                )
+            
+            logger.debug("DATABASE: Medicine '%s' not found (no exact or similarity matches)", name)
             return None
 
+    def add_medicine(self, data: Dict) -> int:
+        """Add a new medicine to the database."""
+        with get_db_context() as db:
+            medicine = Medicine(
+                name=data['name'],
+                category=data.get('category'),
+                manufacturer=data.get('manufacturer'),
+                price=data['price'],
+                stock=data.get('stock', 0),
+                requires_prescription=data.get('requires_prescription', False),
+                description=data.get('description'),
+                indications=data.get('indications'),
+                generic_equivalent=data.get('generic_equivalent'),
+                dosage_form=data.get('dosage_form'),
+                strength=data.get('strength'),
+                active_ingredients=data.get('active_ingredients')
+            )
+            db.add(medicine)
+            db.commit()
+            db.refresh(medicine)
+            invalidate_medicine_cache()
+            return medicine.id
+
+    def update_medicine(self, med_id: int, data: Dict) -> bool:
+        """Update an existing medicine."""
+        with get_db_context() as db:
+            medicine = db.query(Medicine).filter(Medicine.id == med_id).first()
+            if not medicine:
+                return False
+            
+            for key, value in data.items():
+                if hasattr(medicine, key):
+                    setattr(medicine, key, value)
+            
+            db.commit()
+            invalidate_medicine_cache()
+            return True
+
+    def delete_medicine(self, med_id: int) -> bool:
+        """Delete a medicine from the database."""
+        with get_db_context() as db:
+            medicine = db.query(Medicine).filter(Medicine.id == med_id).first()
+            if not medicine:
+                return False
+            db.delete(medicine)
+            db.commit()
+            invalidate_medicine_cache()
+            return True
+
     def resolve_patient(self, phone: str, name: Optional[str] = None) -> Dict:
         """
         Get or create patient by phone number.
@@ -178,17 +417,18 @@ class Database:
             
             if not patient:
                 is_new = True
-                # Generate a new PID
-                patient_count = db.query(Patient).count()
-                pid = f"PID-{patient_count + 1 + 1000:06d}" # PT-1001 base
-                
+                # Insert with a placeholder, then derive the PID from the key
                 patient = Patient(
-                    user_id=pid,
+                    user_id=f"TMP-{uuid.uuid4().hex}",
                     phone=phone,
-                    name=name or f"Patient {pid[-4:]}",
                     created_at=datetime.utcnow()
                 )
                 db.add(patient)
+                db.flush()  # Get patient.id
+                
+                pid = f"PID-{patient.id + 1000:06d}" # PT-1001 base
+                patient.user_id = pid
+                patient.name = name or f"Patient {pid[-4:]}"
                 db.commit()
                 db.refresh(patient)
             
@@ -221,18 +461,11 @@ class Database:
             True if successful, False otherwise
         """
         with get_db_context() as db:
-            medicine = db.query(Medicine).filter(
-                Medicine.name.ilike(name)
-            ).first()
-            
-            if not medicine:
+            result = db.execute(_decrement_stock_stmt(name, qty))
+            if result.rowcount != 1:
                 return False
-            
-            if medicine.stock < qty:
-                return False
-            
-            medicine.stock -= qty
             db.commit()
+            invalidate_medicine_cache(names=False)
             return True
     
     def create_order(
@@ -255,22 +488,19 @@ class Database:
             Order ID string
         """
         with get_db_context() as db:
-            # Generate order ID
-            order_count = db.query(Order).count()
-            order_id_str = f"ORD-{order_count + 1:05d}"
+            # Resolve all medicines in one query
+            medicines = _medicines_by_name(db, items)
             
             # Calculate total
             total_amount = 0.0
             for item in items:
-                medicine = db.query(Medicine).filter(
-                    Medicine.name.ilike(item.medicine_name)
-                ).first()
+                medicine = medicines.get(normalize_medicine_name(item.medicine_name))
                 if medicine:
                     total_amount += medicine.price * item.quantity
             
-            # Create order
+            # Create order (placeholder ID until the primary key is known)
             order = Order(
-                order_id=order_id_str,
+                order_id=f"TMP-{uuid.uuid4().hex}",
                 user_id=user_id,
                 status="pending",
                 pharmacist_decision=pharmacist_decision,
@@ -280,22 +510,14 @@ class Database:
             db.add(order)
             db.flush()  # Get order.id
             
-            # Create order items
-            for item in items:
-                medicine = db.query(Medicine).filter(
-                    Medicine.name.ilike(item.medicine_name)
-                ).first()
-                
-                if medicine:
-                    db_item = DBOrderItem(
-                        order_id=order.id,
-                        medicine_id=medicine.id,
-                        medicine_name=medicine.name,
-                        dosage=item.dosage,
-                        quantity=item.quantity,
-                        price=medicine.price,
-                    )
-                    db.add(db_item)
+            # Display ID from the autoincrement key — no COUNT(*) scan, no race
+            order_id_str = f"ORD-{order.id:05d}"
+            order.order_id = order_id_str
+            
+            # Create order items in one multi-row INSERT
+            item_rows = _order_item_rows(order.id, items, medicines)
+            if item_rows:
+                db.bulk_insert_mappings(DBOrderItem, item_rows)
             
             db.commit()
             return order_id_str
@@ -311,7 +533,9 @@ class Database:
             Order dict or None
         """
         with get_db_context() as db:
-            order = db.query(Order).filter(
+            order = db.query(Order).options(
+                selectinload(Order.items)
+            ).filter(
                 Order.order_id == order_id
             ).first()
             
@@ -361,22 +585,13 @@ class Database:
             True if successful
         """
         with get_db_context() as db:
-            order = db.query(Order).filter(
-                Order.order_id == order_id
-            ).first()
+            result = db.execute(_audit_log_insert_stmt(
+                order_id, agent_name, decision, reasoning, confidence_score, extra_data
+            ))
             
-            if not order:
+            if result.rowcount == 0:
                 return False
             
-            log = AuditLog(
-                order_id=order.id,
-                agent_name=agent_name,
-                decision=decision,
-                reasoning=reasoning,
-                confidence_score=confidence_score,
-                extra_data=extra_data or {},
-            )
-            db.add(log)
             db.commit()
             return True
 
@@ -414,34 +629,21 @@ class TransactionContext:
             Medicine dict or None if not found
         """
         medicine = self.session.query(Medicine).filter(
-            Medicine.name.ilike(name)
+            Medicine.name_norm == normalize_medicine_name(name)
         ).first()
         
         if not medicine:
             return None
         
-        return {
-            "id": medicine.id,
-            "name": medicine.name,
-            "category": medicine.category,
-            "manufacturer": medicine.manufacturer,
-            "price": medicine.price,
-            "stock": medicine.stock,
-            "requires_prescription": medicine.requires_prescription,
-            "description": medicine.description,
-            "indications": medicine.indications,
-            "generic_equivalent": medicine.generic_equivalent,
-            "dosage_form": medicine.dosage_form,
-            "strength": medicine.strength,
-            "active_ingredients": medicine.active_ingredients,
-            "side_effects": medicine.side_effects,
-        }
+        return _medicine_to_dict(medicine)
     
     def decrement_stock(self, name: str, qty: int) -> bool:
         """
-        Decrement medicine stock within transaction with pessimistic locking.
+        Decrement medicine stock within transaction.
         
-        Uses SELECT FOR UPDATE to prevent race conditions.
+        The stock check and the decrement are one conditional UPDATE, so
+        concurrent orders cannot oversell and no row lock is held while
+        Python runs.
         
         Args:
             name: Medicine name
@@ -450,18 +652,8 @@ class TransactionContext:
         Returns:
             True if successful, False otherwise
         """
-        medicine = self.session.query(Medicine).filter(
-            Medicine.name.ilike(name)
-        ).with_for_update().first()  # Pessimistic lock - prevents race conditions
-        
-        if not medicine:
-            return False
-        
-        if medicine.stock < qty:
-            return False
-        
-        medicine.stock -= qty
-        return True
+        result = self.session.execute(_decrement_stock_stmt(name, qty))
+        return result.rowcount == 1
     
     def create_order(
         self,
@@ -492,12 +684,13 @@ class TransactionContext:
         short_uuid = str(uuid.uuid4())[:8].upper()
         order_id_str = f"ORD-{timestamp}-{short_uuid}"
         
+        # Resolve all medicines in one query
+        medicines = _medicines_by_name(self.session, items)
+        
         # Calculate total
         total_amount = 0.0
         for item in items:
-            medicine = self.session.query(Medicine).filter(
-                Medicine.name.ilike(item.medicine_name)
-            ).first()
+            medicine = medicines.get(normalize_medicine_name(item.medicine_name))
             if medicine:
                 total_amount += medicine.price * item.quantity
         
@@ -513,22 +706,10 @@ class TransactionContext:
         self.session.add(order)
         self.session.flush()  # Get order.id
         
-        # Create order items
-        for item in items:
-            medicine = self.session.query(Medicine).filter(
-                Medicine.name.ilike(item.medicine_name)
-            ).first()
-            
-            if medicine:
-                db_item = DBOrderItem(
-                    order_id=order.id,
-                    medicine_id=medicine.id,
-                    medicine_name=medicine.name,
-                    dosage=item.dosage,
-                    quantity=item.quantity,
-                    price=medicine.price,
-                )
-                self.session.add(db_item)
+        # Create order items in one multi-row INSERT
+        item_rows = _order_item_rows(order.id, items, medicines)
+        if item_rows:
+            self.session.bulk_insert_mappings(DBOrderItem, item_rows)
         
         return order_id_str
     
@@ -555,26 +736,26 @@ class TransactionContext:
         Returns:
             True if successful
         """
-        order = self.session.query(Order).filter(
-            Order.order_id == order_id
-        ).first()
-        
-        if not order:
-            return False
-        
-        log = AuditLog(
-            order_id=order.id,
-            agent_name=agent_name,
-            decision=decision,
-            reasoning=reasoning,
-            confidence_score=confidence_score,
-            extra_data=extra_data or {},
-        )
-        self.session.add(log)
-        return True
+        result = self.session.execute(_audit_log_insert_stmt(
+            order_id, agent_name, decision, reasoning, confidence_score, extra_data
+        ))
+        return result.rowcount > 0
 
 
 
+def _similarity_length_bounds(length: int) -> Tuple[int, int]:
+    """
+    Candidate length range that can still reach SIMILARITY_THRESHOLD.
+    
+    Levenshtein distance is at least the length difference, so a candidate
+    of length L only qualifies if |L - length| <= (1 - threshold) * max(L, length).
+    """
+    return (
+        math.ceil(length * SIMILARITY_THRESHOLD),
+        math.floor(length / SIMILARITY_THRESHOLD),
+    )
+
+
 def calculate_similarity(str1: str, str2: str) -> float:
     """
     Calculate similarity between two strings using Levenshtein distance.
@@ -586,7 +767,9 @@ def calculate_similarity(str1: str, str2: str) -> float:
     Returns:
         Similarity score between 0.0 and 1.0
     """
-    # Simple Levenshtein distance implementation
+    if HAS_RAPIDFUZZ:
+        return Levenshtein.normalized_similarity(str1, str2)
+    
     if str1 == str2:
         return 1.0
     
@@ -594,75 +777,113 @@ def calculate_similarity(str1: str, str2: str) -> float:
     if len1 == 0 or len2 == 0:
         return 0.0
     
-    # Create distance matrix
-    matrix = [[0] * (len2 + 1) for _ in range(len1 + 1)]
-    
-    # Initialize first row and column
-    for i in range(len1 + 1):
-        matrix[i][0] = i
-    for j in range(len2 + 1):
-        matrix[0][j] = j
-    
-    # Calculate distances
-    for i in range(1, len1 + 1):
-        for j in range(1, len2 + 1):
-            cost = 0 if str1[i-1] == str2[j-1] else 1
-            matrix[i][j] = min(
-                matrix[i-1][j] + 1,      # deletion
-                matrix[i][j-1] + 1,      # insertion
-                matrix[i-1][j-1] + cost  # substitution
-            )
-    
     # Calculate similarity (1 - normalized distance)
     max_len = max(len1, len2)
-    distance = matrix[len1][len2]
+    distance = _levenshtein_distance(str1, str2)
     similarity = 1.0 - (distance / max_len)
     
     return similarity
 
 
-    def add_medicine(self, data: Dict) -> int:
-        """Add a new medicine to the database."""
-        with get_db_context() as db:
-            medicine = Medicine(
-                name=data['name'],
-                category=data.get('category'),
-                manufacturer=data.get('manufacturer'),
-                price=data['price'],
-                stock=data.get('stock', 0),
-                requires_prescription=data.get('requires_prescription', False),
-                description=data.get('description'),
-                indications=data.get('indications'),
-                generic_equivalent=data.get('generic_equivalent'),
-                dosage_form=data.get('dosage_form'),
-                strength=data.get('strength'),
-                active_ingredients=data.get('active_ingredients')
-            )
-            db.add(medicine)
-            db.commit()
-            db.refresh(medicine)
-            return medicine.id
+def _trim_common_affixes(str1: str, str2: str) -> Tuple[str, str]:
+    """
+    Drop the shared prefix and suffix of two strings.
+    
+    Matching ends cost no edits, so the Levenshtein distance of the
+    remainders equals that of the originals — on a smaller matrix.
+    """
+    shortest = min(len(str1), len(str2))
+    start = 0
+    while start < shortest and str1[start] == str2[start]:
+        start += 1
+    end = 0
+    while end < shortest - start and str1[-1 - end] == str2[-1 - end]:
+        end += 1
+    return str1[start:len(str1) - end], str2[start:len(str2) - end]
 
-    def update_medicine(self, med_id: int, data: Dict) -> bool:
-        """Update an existing medicine."""
-        with get_db_context() as db:
-            medicine = db.query(Medicine).filter(Medicine.id == med_id).first()
-            if not medicine:
-                return False
-            
-            for key, value in data.items():
-                if hasattr(medicine, key):
-                    setattr(medicine, key, value)
-            
-            db.commit()
-            return True
 
-    def delete_medicine(self, med_id: int) -> bool:
-        """Delete a medicine from the database."""
-        with get_db_context() as db:
-            medicine = db.query(Medicine).filter(Medicine.id == med_id).first()
-            if not medicine:
-                return False
-            db.delete(medicine)
-            db.commit()
-            return True
+def _bounded_levenshtein(str1: str, str2: str, k: int) -> int:
+    """
+    Levenshtein distance if it is at most k, otherwise k + 1.
+    
+    Only the diagonal band |i - j| <= k is computed, and the scan stops as
+    soon as a whole row exceeds k, so clear non-matches bail out early.
+    """
+    len1, len2 = len(str1), len(str2)
+    over = k + 1
+    if abs(len1 - len2) > k:
+        return over
+    
+    str1, str2 = _trim_common_affixes(str1, str2)
+    len1, len2 = len(str1), len(str2)
+    
+    # One row updated in place: row[j] holds the previous row until column
+    # j is computed, and diag carries the previous row's value at j - 1.
+    # Cells right of the band are never written and keep reading as over.
+    row = [j if j <= k else over for j in range(len2 + 1)]
+    for i in range(1, len1 + 1):
+        lo, hi = max(1, i - k), min(len2, i + k)
+        diag = row[lo - 1]
+        left = i if i <= k else over
+        if lo == 1:
+            row[0] = left
+        row_min = left
+        c1 = str1[i - 1]
+        for j in range(lo, hi + 1):
+            up = row[j]
+            value = diag if c1 == str2[j - 1] else diag + 1
+            if up + 1 < value:
+                value = up + 1
+            if left + 1 < value:
+                value = left + 1
+            if value > over:
+                value = over
+            row[j] = value
+            diag, left = up, value
+            if value < row_min:
+                row_min = value
+        if row_min > k:
+            return over
+    
+    return row[len2]
+
+
+def _levenshtein_distance(str1: str, str2: str) -> int:
+    """
+    Levenshtein distance via Myers' bit-parallel algorithm (Hyyrö's variant).
+    
+    The shorter string is encoded as per-character bitmasks in a Python int,
+    so each character of the longer string costs a handful of bit ops
+    instead of a full DP column.
+    """
+    str1, str2 = _trim_common_affixes(str1, str2)
+    if len(str1) < len(str2):
+        str1, str2 = str2, str1
+    m = len(str2)
+    if m == 0:
+        return len(str1)
+    
+    peq: Dict[str, int] = {}
+    for i, c in enumerate(str2):
+        peq[c] = peq.get(c, 0) | (1 << i)
+    
+    mask = (1 << m) - 1
+    high = 1 << (m - 1)
+    vp, vn, score = mask, 0, m
+    
+    for c in str1:
+        eq = peq.get(c, 0)
+        xv = eq | vn
+        xh = (((eq & vp) + vp) ^ vp) | eq
+        hp = vn | ~(xh | vp)
+        hn = vp & xh
+        if hp & high:
+            score += 1
+        elif hn & high:
+            score -= 1
+        hp = (hp << 1) | 1
+        hn <<= 1
+        vp = (hn | ~(xv | hp)) & mask
+        vn = hp & xv
+    
+    return score
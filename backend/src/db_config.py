@@ -9,12 +9,12 @@ Environment variable DATABASE_URL determines which to use:
 """
 
 import os
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, Session
 from contextlib import contextmanager
 from typing import Generator
 
-from src.models import Base
+from src.models import Base, normalize_medicine_name
 
 # ------------------------------------------------------------------
 # DATABASE URL
@@ -32,15 +32,44 @@ if DATABASE_URL.startswith("sqlite"):
 # ------------------------------------------------------------------
 # ENGINE & SESSION
 # ------------------------------------------------------------------
+# Connection pool for server databases. SQLite uses SQLAlchemy's default
+# pool, which does not accept these sizing options.
+POOL_OPTIONS = {
+    "pool_size": 20,
+    "max_overflow": 10,
+    "pool_pre_ping": True,   # Drop dead connections (Supabase idles them out)
+    "pool_recycle": 1800,
+}
+
 def get_engine():
     return create_engine(
         DATABASE_URL,
         connect_args=connect_args,
         echo=False,  # Set to True for SQL debugging
+        query_cache_size=1200,  # Compiled SQL cache shared by the many small queries
+        **({} if DATABASE_URL.startswith("sqlite") else POOL_OPTIONS),
     )
 
 engine = get_engine()
 
+# SQLite tuning: WAL lets readers run alongside the single writer and,
+# with synchronous=NORMAL, commits append to the log without an fsync each.
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",   # 256 MB
+    "PRAGMA cache_size=-65536",     # 64 MB
+)
+
+if DATABASE_URL.startswith("sqlite"):
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_conn, connection_record):
+        cursor = dbapi_conn.cursor()
+        for pragma in SQLITE_PRAGMAS:
+            cursor.execute(pragma)
+        cursor.close()
+
 def get_session_local():
     return sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -76,6 +105,55 @@ def init_db():
             conn.commit()
     except Exception:
         pass  # Safe to ignore if table doesn't exist yet
+
+    # Normalized medicine name for b-tree lookups instead of ILIKE
+    try:
+        with engine.begin() as conn:
+            conn.execute(__import__("sqlalchemy").text("ALTER TABLE medicines ADD COLUMN name_norm VARCHAR(255)"))
+    except Exception: pass
+    try:
+        with engine.begin() as conn:
+            # Repair rows written by raw SQL (seed scripts) that skipped or
+            # went stale on name_norm; normalized in Python so the values
+            # match normalize_medicine_name exactly
+            rows = conn.execute(__import__("sqlalchemy").text(
+                "SELECT id, name, name_norm FROM medicines"
+            )).all()
+            stale = [
+                {"id": row.id, "name_norm": normalize_medicine_name(row.name)}
+                for row in rows
+                if row.name is not None and row.name_norm != normalize_medicine_name(row.name)
+            ]
+            if stale:
+                conn.execute(__import__("sqlalchemy").text(
+                    "UPDATE medicines SET name_norm = :name_norm WHERE id = :id"
+                ), stale)
+            conn.execute(__import__("sqlalchemy").text(
+                "CREATE INDEX IF NOT EXISTS ix_medicines_name_norm ON medicines (name_norm)"
+            ))
+    except Exception as e:
+        print(f"⚠️  name_norm backfill failed: {e}")
+
+    # Indexes added to existing tables later; create_all skips those tables
+    try:
+        with engine.begin() as conn:
+            for table in Base.metadata.sorted_tables:
+                for index in table.indexes:
+                    index.create(bind=conn, checkfirst=True)
+    except Exception as e:
+        print(f"⚠️  index creation failed: {e}")
+
+    # Trigram index for fuzzy medicine lookups (PostgreSQL only)
+    if is_postgres():
+        try:
+            with engine.begin() as conn:
+                conn.execute(__import__("sqlalchemy").text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+                conn.execute(__import__("sqlalchemy").text(
+                    "CREATE INDEX IF NOT EXISTS ix_medicines_name_trgm "
+                    "ON medicines USING gin (lower(name) gin_trgm_ops)"
+                ))
+        except Exception as e:
+            print(f"⚠️  pg_trgm index not created, fuzzy search will scan: {e}")
     print(f"✅ Database initialized: {DATABASE_URL}")
 
 
@@ -31,17 +31,27 @@ class DomainError(Exception):
     def __init__(self, message: str, details: Optional[Dict[str, Any]] = None):
         self.message = message
         self.details = details or {}
+        self._cached = None
         super().__init__(self.message)
     
     def to_dict(self) -> Dict[str, Any]:
-        """Convert error to dictionary for logging/API responses."""
-        return {
-            "error_type": self.__class__.__name__,
-            "severity": self.severity,
-            "recoverable": self.recoverable,
-            "message": self.message,
-            "details": self.details
-        }
+        """
+        Convert error to dictionary for logging/API responses.
+        
+        Built once per instance: errors are not modified after being
+        raised, and several handlers may log the same one. The dict is
+        shared between callers, so copy it before changing it.
+        """
+        cached = getattr(self, "_cached", None)
+        if cached is None:
+            cached = self._cached = {
+                "error_type": self.__class__.__name__,
+                "severity": self.severity,
+                "recoverable": self.recoverable,
+                "message": self.message,
+                "details": self.details
+            }
+        return cached
 
 
 class InfrastructureError(Exception):
@@ -64,18 +74,27 @@ class InfrastructureError(Exception):
         self.message = message
         self.retry_after = retry_after  # Seconds to wait before retry
         self.details = details or {}
+        self._cached = None
         super().__init__(self.message)
     
     def to_dict(self) -> Dict[str, Any]:
-        """Convert error to dictionary for logging/API responses."""
-        return {
-            "error_type": self.__class__.__name__,
-            "severity": self.severity,
-            "recoverable": self.recoverable,
-            "message": self.message,
-            "retry_after": self.retry_after,
-            "details": self.details
-        }
+        """
+        Convert error to dictionary for logging/API responses.
+        
+        Built once per instance and shared between callers, so copy it
+        before changing it.
+        """
+        cached = getattr(self, "_cached", None)
+        if cached is None:
+            cached = self._cached = {
+                "error_type": self.__class__.__name__,
+                "severity": self.severity,
+                "recoverable": self.recoverable,
+                "message": self.message,
+                "retry_after": self.retry_after,
+                "details": self.details
+            }
+        return cached
 
 
 # ------------------------------------------------------------------
@@ -296,6 +315,11 @@ class TransactionError(DatabaseError):
         )
 
 
+# Message-independent part of the classification for foreign exception
+# types, filled on first sight (bounded by the number of exception classes)
+_UNKNOWN_CACHE: Dict[type, Dict[str, Any]] = {}
+
+
 # ------------------------------------------------------------------
 # ERROR HANDLER UTILITIES
 # ------------------------------------------------------------------
@@ -314,13 +338,16 @@ def classify_error(error: Exception) -> Dict[str, Any]:
         return error.to_dict()
     
     # Unknown error - treat as infrastructure error
-    return {
-        "error_type": "UnknownError",
-        "severity": "error",
-        "recoverable": False,
-        "message": str(error),
-        "details": {"original_type": type(error).__name__}
-    }
+    cls = type(error)
+    base = _UNKNOWN_CACHE.get(cls)
+    if base is None:
+        base = _UNKNOWN_CACHE[cls] = {
+            "error_type": "UnknownError",
+            "severity": "error",
+            "recoverable": False,
+            "details": {"original_type": cls.__name__}
+        }
+    return {**base, "message": str(error)}
 
 
 def should_retry(error: Exception) -> bool:
@@ -333,13 +360,12 @@ def should_retry(error: Exception) -> bool:
     Returns:
         True if retry is appropriate
     """
-    if isinstance(error, InfrastructureError):
-        return error.recoverable
-    
-    if isinstance(error, DomainError):
-        return error.recoverable
-    
-    return False
+    # Every DomainError/InfrastructureError carries `recoverable`;
+    # other exceptions don't, and are never retried
+    try:
+        return bool(error.recoverable)
+    except AttributeError:
+        return False
 
 
 def get_retry_delay(error: Exception) -> int:
@@ -352,7 +378,8 @@ def get_retry_delay(error: Exception) -> int:
     Returns:
         Seconds to wait before retry (0 if no retry)
     """
-    if isinstance(error, InfrastructureError):
+    # Only InfrastructureError defines `retry_after`
+    try:
         return error.retry_after or 5
-    
-    return 0
+    except AttributeError:
+        return 0
@@ -10,8 +10,9 @@ Pattern: Observer/Pub-Sub
 - Failures in one handler don't affect others
 """
 
-from typing import Callable, Dict, List, Any, Type, Optional
-from collections import defaultdict
+from typing import Callable, Deque, Dict, List, Any, Set, Tuple, Type, Optional
+from collections import deque
+from itertools import islice
 import asyncio
 import logging
 from datetime import datetime
@@ -36,21 +37,29 @@ class EventBus:
     - Event history for debugging
     """
     
-    def __init__(self, max_history: int = 1000):
+    def __init__(self, max_history: int = 1000, record_history: bool = True):
         """
         Initialize event bus.
         
         Args:
             max_history: Maximum number of events to keep in history
+            record_history: Set False to skip history recording entirely
         """
-        self._subscribers: Dict[str, List[Callable]] = defaultdict(list)
-        self._event_history: List[Dict[str, Any]] = []
+        # Immutable tuples of (handler, is_coroutine_function, name): publish
+        # iterates them without copying, subscribe/unsubscribe (rare) rebuild them
+        self._subscribers: Dict[str, Tuple[Tuple[Callable, bool, str], ...]] = {}
+        # Same handlers as sets, for O(1) duplicate checks on (un)subscribe
+        self._subscriber_sets: Dict[str, Set[Callable]] = {}
+        # Per-event-type sync dispatchers, rebuilt whenever subscriptions change
+        self._dispatch: Dict[str, Callable[[Event], None]] = {}
+        # Ring buffer of raw events; dicts are only built when history is read
+        self._event_history: Deque[Event] = deque(maxlen=max_history)
         self._max_history = max_history
-        self._stats = {
-            "events_published": 0,
-            "events_processed": 0,
-            "handler_errors": 0
-        }
+        self._record_history = record_history
+        # Plain int counters; get_stats() assembles the dict on demand
+        self._published = 0
+        self._processed = 0
+        self._handler_errors = 0
     
     def subscribe(self, event_type: Type[Event], handler: Callable[[Event], None]):
         """
@@ -63,12 +72,19 @@ class EventBus:
         Example:
             bus.subscribe(OrderCreatedEvent, send_order_notification)
         """
-        event_name = event_type.__name__
-        if handler not in self._subscribers[event_name]:
-            self._subscribers[event_name].append(handler)
-            logger.info(f"Subscribed handler to {event_name}: {handler.__name__}")
+        event_name = event_type.event_name
+        handler_name = getattr(handler, "__name__", repr(handler))
+        registered = self._subscriber_sets.setdefault(event_name, set())
+        if handler not in registered:
+            registered.add(handler)
+            current = self._subscribers.get(event_name, ())
+            # Classify and name once here rather than on every publish
+            is_coro = asyncio.iscoroutinefunction(handler)
+            self._subscribers[event_name] = current + ((handler, is_coro, handler_name),)
+            self._rebuild_dispatch(event_name)
+            logger.info("Subscribed handler to %s: %s", event_name, handler_name)
         else:
-            logger.debug(f"Handler {handler.__name__} already subscribed to {event_name}")
+            logger.debug("Handler %s already subscribed to %s", handler_name, event_name)
     
     def unsubscribe(self, event_type: Type[Event], handler: Callable[[Event], None]):
         """
@@ -78,10 +94,18 @@ class EventBus:
             event_type: Event class to unsubscribe from
             handler: Handler to remove
         """
-        event_name = event_type.__name__
-        if handler in self._subscribers[event_name]:
-            self._subscribers[event_name].remove(handler)
-            logger.info(f"Unsubscribed handler from {event_name}: {handler.__name__}")
+        event_name = event_type.event_name
+        registered = self._subscriber_sets.get(event_name)
+        if registered and handler in registered:
+            registered.discard(handler)
+            remaining = tuple(entry for entry in self._subscribers[event_name] if entry[0] != handler)
+            if remaining:
+                self._subscribers[event_name] = remaining
+            else:
+                del self._subscribers[event_name]
+                del self._subscriber_sets[event_name]
+            self._rebuild_dispatch(event_name)
+            logger.info("Unsubscribed handler from %s: %s", event_name, getattr(handler, "__name__", repr(handler)))
     
     def publish(self, event: Event):
         """
@@ -93,33 +117,60 @@ class EventBus:
         Args:
             event: Event instance to publish
         """
-        event_name = type(event).__name__
-        self._stats["events_published"] += 1
+        event_name = event.event_name
+        self._published += 1
         
         # Add to history
-        self._add_to_history(event)
+        if self._record_history:
+            self._event_history.append(event)
         
-        # Get subscribers for this event type
-        handlers = self._subscribers.get(event_name, [])
+        dispatch = self._dispatch.get(event_name)
+        
+        if dispatch is None:
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("No subscribers for %s", event_name)
+            return
+        
+        dispatch(event)
+    
+    def _rebuild_dispatch(self, event_name: str):
+        """
+        Build the sync dispatcher for one event type.
+        
+        The closure captures the current handler tuple, so publish does a
+        single dict lookup and call instead of re-reading subscriptions.
         
+        Args:
+            event_name: Event class name whose subscriptions changed
+        """
+        handlers = self._subscribers.get(event_name)
         if not handlers:
-            logger.debug(f"No subscribers for {event_name}")
+            self._dispatch.pop(event_name, None)
             return
         
-        logger.info(f"Publishing {event_name} to {len(handlers)} handler(s)")
+        bus = self
+        handler_count = len(handlers)
+        
+        def dispatch(event: Event):
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("Publishing %s to %d handler(s)", event_name, handler_count)
+            debug = logger.isEnabledFor(logging.DEBUG)
+            
+            # Execute each handler with error isolation
+            for handler, _, handler_name in handlers:
+                try:
+                    handler(event)
+                    bus._processed += 1
+                    if debug:
+                        logger.debug("Handler %s processed %s", handler_name, event_name)
+                except Exception as e:
+                    bus._handler_errors += 1
+                    logger.error(
+                        "Handler %s failed for %s: %s", handler_name, event_name, e,
+                        exc_info=True
+                    )
         
-        # Execute each handler with error isolation
-        for handler in handlers:
-            try:
-                handler(event)
-                self._stats["events_processed"] += 1
-                logger.debug(f"Handler {handler.__name__} processed {event_name}")
-            except Exception as e:
-                self._stats["handler_errors"] += 1
-                logger.error(
-                    f"Handler {handler.__name__} failed for {event_name}: {e}",
-                    exc_info=True
-                )
+        self._dispatch[event_name] = dispatch
     
     async def publish_async(self, event: Event):
         """
@@ -130,29 +181,33 @@ class EventBus:
         Args:
             event: Event instance to publish
         """
-        event_name = type(event).__name__
-        self._stats["events_published"] += 1
+        event_name = event.event_name
+        self._published += 1
         
         # Add to history
-        self._add_to_history(event)
+        if self._record_history:
+            self._event_history.append(event)
         
         # Get subscribers for this event type
-        handlers = self._subscribers.get(event_name, [])
+        handlers = self._subscribers.get(event_name)
         
         if not handlers:
-            logger.debug(f"No subscribers for {event_name}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("No subscribers for %s", event_name)
             return
         
-        logger.info(f"Publishing {event_name} to {len(handlers)} handler(s) (async)")
-        
-        # Execute handlers concurrently
-        tasks = []
-        for handler in handlers:
-            task = asyncio.create_task(self._execute_handler_async(handler, event))
-            tasks.append(task)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Publishing %s to %d handler(s) (async)", event_name, len(handlers))
         
-        # Wait for all handlers to complete
-        await asyncio.gather(*tasks, return_exceptions=True)
+        # Execute handlers concurrently; gather wraps each coroutine in a task
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(
+            *[
+                self._execute_handler_async(handler, is_coro, handler_name, event, loop)
+                for handler, is_coro, handler_name in handlers
+            ],
+            return_exceptions=True,
+        )
 
     def publish_background(self, event: Event):
         """
@@ -167,56 +222,64 @@ class EventBus:
         try:
             loop = asyncio.get_running_loop()
             loop.create_task(self.publish_async(event))
-            logger.info(f"Event {type(event).__name__} scheduled in background")
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("Event %s scheduled in background", event.event_name)
         except RuntimeError:
             # Fallback if no loop is running (e.g., during tests or script execution)
-            logger.warning(f"No running event loop found. Publishing {type(event).__name__} synchronously.")
+            logger.warning("No running event loop found. Publishing %s synchronously.", event.event_name)
             self.publish(event)
     
-    async def _execute_handler_async(self, handler: Callable, event: Event):
+    async def _execute_handler_async(
+        self,
+        handler: Callable,
+        is_coro: bool,
+        handler_name: str,
+        event: Event,
+        loop: asyncio.AbstractEventLoop,
+    ):
         """
         Execute a handler asynchronously with error isolation.
         
         Args:
             handler: Handler function
+            is_coro: Whether handler is a coroutine function (set at subscribe)
+            handler_name: Handler name for logging (set at subscribe)
             event: Event to pass to handler
+            loop: Running event loop, used to offload sync handlers
         """
-        event_name = type(event).__name__
+        event_name = event.event_name
         try:
-            # Check if handler is async
-            if asyncio.iscoroutinefunction(handler):
+            if is_coro:
                 await handler(event)
             else:
                 # Run sync handler in executor
-                loop = asyncio.get_event_loop()
                 await loop.run_in_executor(None, handler, event)
             
-            self._stats["events_processed"] += 1
-            logger.debug(f"Handler {handler.__name__} processed {event_name}")
+            self._processed += 1
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Handler %s processed %s", handler_name, event_name)
         except Exception as e:
-            self._stats["handler_errors"] += 1
+            self._handler_errors += 1
             logger.error(
-                f"Handler {handler.__name__} failed for {event_name}: {e}",
+                "Handler %s failed for %s: %s", handler_name, event_name, e,
                 exc_info=True
             )
     
-    def _add_to_history(self, event: Event):
+    @staticmethod
+    def _history_entry(event: Event) -> Dict[str, Any]:
         """
-        Add event to history for debugging.
+        Build the debugging record for a stored event.
         
         Args:
-            event: Event to add
+            event: Event from history
         """
-        self._event_history.append({
-            "event_type": type(event).__name__,
+        return {
+            "event_type": event.event_name,
             "event_id": event.event_id,
             "timestamp": event.timestamp.isoformat(),
-            "data": event.data
-        })
-        
-        # Trim history if needed
-        if len(self._event_history) > self._max_history:
-            self._event_history = self._event_history[-self._max_history:]
+            # Typed events carry their payload in fields, not in `data`
+            "data": {**event.data, **event.payload}
+        }
     
     def get_history(self, event_type: Optional[str] = None, limit: int = 100) -> List[Dict[str, Any]]:
         """
@@ -229,12 +292,14 @@ class EventBus:
         Returns:
             List of event dictionaries
         """
-        history = self._event_history
-        
+        # Walk newest-first and stop after `limit` matches, then restore
+        # chronological order; no full-history list is built
+        newest = reversed(self._event_history)
         if event_type:
-            history = [e for e in history if e["event_type"] == event_type]
+            newest = (e for e in newest if e.event_name == event_type)
+        events = list(islice(newest, limit))[::-1]
         
-        return history[-limit:]
+        return [self._history_entry(e) for e in events]
     
     def get_stats(self) -> Dict[str, Any]:
         """
@@ -244,7 +309,9 @@ class EventBus:
             Dictionary with statistics
         """
         return {
-            **self._stats,
+            "events_published": self._published,
+            "events_processed": self._processed,
+            "handler_errors": self._handler_errors,
             "active_subscriptions": sum(len(handlers) for handlers in self._subscribers.values()),
             "event_types": list(self._subscribers.keys()),
             "history_size": len(self._event_history)
@@ -257,11 +324,9 @@ class EventBus:
     
     def reset_stats(self):
         """Reset statistics."""
-        self._stats = {
-            "events_published": 0,
-            "events_processed": 0,
-            "handler_errors": 0
-        }
+        self._published = 0
+        self._processed = 0
+        self._handler_errors = 0
         logger.info("Event bus statistics reset")
 
 
@@ -269,22 +334,23 @@ class EventBus:
 # SINGLETON INSTANCE
 # ------------------------------------------------------------------
 
-_event_bus_instance: Optional[EventBus] = None
-
-
 def get_event_bus() -> EventBus:
     """
     Get the global event bus instance (singleton).
     
+    The instance lives on the function object, so repeat calls are one
+    attribute read and a None check.
+    
     Returns:
         EventBus instance
     """
-    global _event_bus_instance
-    if _event_bus_instance is None:
-        _event_bus_instance = EventBus()
-    # DEBUG: Log instance ID to detect multiple buses
-    # print(f"DEBUG: EventBus instance ID: {id(_event_bus_instance)}")
-    return _event_bus_instance
+    bus = get_event_bus._bus
+    if bus is None:
+        bus = get_event_bus._bus = EventBus()
+    return bus
+
+
+get_event_bus._bus = None
 
 
 def reset_event_bus():
@@ -293,5 +359,4 @@ def reset_event_bus():
     
     Useful for testing.
     """
-    global _event_bus_instance
-    _event_bus_instance = None
+    get_event_bus._bus = None
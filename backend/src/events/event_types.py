@@ -7,36 +7,81 @@ Events represent things that have happened in the system.
 They are immutable and carry all necessary data.
 """
 
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, ClassVar, Tuple
 from datetime import datetime
-from pydantic import BaseModel, Field
+from dataclasses import dataclass, field, fields
+import itertools
+import time
+
+# Process-wide sequence appended to event ids so bursts never collide
+_EVENT_COUNTER = itertools.count()
+
+# Fields every event shares; anything else a subclass declares is payload
+_BASE_FIELDS = frozenset({"event_id", "event_type", "timestamp_ns", "data"})
+
+# Payload field names per event class, resolved on first use
+_PAYLOAD_FIELDS: Dict[type, Tuple[str, ...]] = {}
 
 
 # ------------------------------------------------------------------
 # BASE EVENT
 # ------------------------------------------------------------------
 
-class Event(BaseModel):
+@dataclass(slots=True, frozen=True, kw_only=True)
+class Event:
     """
     Base event class.
     
     All domain events inherit from this class.
     Events are immutable records of things that happened.
+    
+    Plain slotted dataclasses: events are small, built on hot paths and
+    only ever read by attribute, so no validation layer is needed.
     """
     
-    event_id: str = Field(default_factory=lambda: f"evt_{datetime.now().timestamp()}")
+    # Concrete class name, resolved once per class (used as the bus routing key)
+    event_name: ClassVar[str] = "Event"
+    
+    event_id: str = ""  # Set in __post_init__ when not given
     event_type: str
-    timestamp: datetime = Field(default_factory=datetime.now)
-    data: Dict[str, Any] = Field(default_factory=dict)
+    timestamp_ns: int = 0  # Wall clock, ns since epoch; set in __post_init__ when not given
+    data: Dict[str, Any] = field(default_factory=dict)
+    
+    def __init_subclass__(cls) -> None:
+        # No zero-arg super() here: slots=True rebuilds the class, which
+        # breaks the implicit __class__ cell
+        cls.event_name = cls.__name__
+    
+    def __post_init__(self) -> None:
+        """Derive event_id and timestamp from a single integer clock read."""
+        if not self.timestamp_ns:
+            object.__setattr__(self, "timestamp_ns", time.time_ns())
+        if not self.event_id:
+            object.__setattr__(self, "event_id", f"evt_{self.timestamp_ns}_{next(_EVENT_COUNTER)}")
+    
+    @property
+    def timestamp(self) -> datetime:
+        """Local-time datetime of the event, built only when read."""
+        seconds, nanos = divmod(self.timestamp_ns, 1_000_000_000)
+        return datetime.fromtimestamp(seconds).replace(microsecond=nanos // 1000)
     
-    class Config:
-        frozen = True  # Immutable
+    @property
+    def payload(self) -> Dict[str, Any]:
+        """Subclass-specific fields (order_id, user_id, ...) as a dict."""
+        cls = type(self)
+        names = _PAYLOAD_FIELDS.get(cls)
+        if names is None:
+            names = _PAYLOAD_FIELDS[cls] = tuple(
+                f.name for f in fields(cls) if f.name not in _BASE_FIELDS
+            )
+        return {name: getattr(self, name) for name in names}
 
 
 # ------------------------------------------------------------------
 # PRESCRIPTION EVENTS
 # ------------------------------------------------------------------
 
+@dataclass(slots=True, frozen=True, kw_only=True)
 class PrescriptionUploadedEvent(Event):
     """Prescription image uploaded by user."""
     
@@ -45,6 +90,7 @@ class PrescriptionUploadedEvent(Event):
     image_path: Optional[str] = None
 
 
+@dataclass(slots=True, frozen=True, kw_only=True)
 class PrescriptionValidatedEvent(Event):
     """Prescription validated by medical validation agent."""
     
@@ -58,6 +104,7 @@ class PrescriptionValidatedEvent(Event):
 # INVENTORY EVENTS
 # ------------------------------------------------------------------
 
+@dataclass(slots=True, frozen=True, kw_only=True)
 class InventoryCheckedEvent(Event):
     """Inventory checked for prescription items."""
     
@@ -68,6 +115,7 @@ class InventoryCheckedEvent(Event):
     items_total: int
 
 
+@dataclass(slots=True, frozen=True, kw_only=True)
 class StockReservedEvent(Event):
     """Stock reserved for an order."""
     
@@ -81,6 +129,7 @@ class StockReservedEvent(Event):
 # ORDER EVENTS
 # ------------------------------------------------------------------
 
+@dataclass(slots=True, frozen=True, kw_only=True)
 class OrderCreatedEvent(Event):
     """Order successfully created."""
     
@@ -93,6 +142,7 @@ class OrderCreatedEvent(Event):
     pharmacist_decision: str
 
 
+@dataclass(slots=True, frozen=True, kw_only=True)
 class OrderRejectedEvent(Event):
     """Order rejected due to validation or inventory issues."""
     
@@ -103,6 +153,7 @@ class OrderRejectedEvent(Event):
     details: Dict[str, Any]
 
 
+@dataclass(slots=True, frozen=True, kw_only=True)
 class OrderFailedEvent(Event):
     """Order processing failed due to system error."""
     
@@ -117,6 +168,7 @@ class OrderFailedEvent(Event):
 # NOTIFICATION EVENTS
 # ------------------------------------------------------------------
 
+@dataclass(slots=True, frozen=True, kw_only=True)
 class NotificationEvent(Event):
     """Generic notification event."""
     
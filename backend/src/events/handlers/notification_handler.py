@@ -7,12 +7,25 @@ This handler reacts to domain events and sends appropriate notifications.
 It's decoupled from the main workflow - failures don't block order processing.
 """
 
+import atexit
 import logging
-from typing import Optional
-from datetime import datetime
-import json
+import os
+import queue
+import threading
+import time
+import weakref
+from typing import Any, BinaryIO, Dict, Optional
+from datetime import date, datetime, time as dt_time, timedelta
 from pathlib import Path
 
+import orjson
+
+try:
+    import msgpack
+    HAS_MSGPACK = True
+except ImportError:
+    HAS_MSGPACK = False
+
 from src.events.event_types import (
     OrderCreatedEvent,
     OrderRejectedEvent,
@@ -28,6 +41,12 @@ from src.errors import NotificationError
 
 logger = logging.getLogger(__name__)
 
+# Pharmacist decision -> status shown in the order notification
+ORDER_STATUS_BY_DECISION = {
+    "approved": "confirmed",
+    "needs_review": "pending_review",
+}
+
 
 # ------------------------------------------------------------------
 # EVENT HANDLERS
@@ -40,23 +59,19 @@ def handle_order_created(event: OrderCreatedEvent):
     Args:
         event: OrderCreatedEvent instance
     """
-    logger.info(f"Handling OrderCreatedEvent: {event.order_id}")
+    logger.info("Handling OrderCreatedEvent: %s", event.order_id)
     
     try:
         # Determine order status for notification
-        if getattr(event, 'pharmacist_decision', None) == "approved":
-            order_status = "confirmed"
-        elif getattr(event, 'pharmacist_decision', None) == "needs_review":
-            order_status = "pending_review"
-        else:
-            order_status = "processing"
+        decision = getattr(event, 'pharmacist_decision', None)
+        order_status = ORDER_STATUS_BY_DECISION.get(decision, "processing")
         
         # Sent notification using the correct service method
         # Use event.phone directly (it contains the patient's number)
         chat_id = event.phone
         
         if not chat_id:
-            logger.warning(f"Skipping order notification for {event.order_id}: No phone number provided")
+            logger.warning("Skipping order notification for %s: No phone number provided", event.order_id)
             _log_notification(event, "order_confirmation", "skipped", "No phone number")
             return
 
@@ -70,14 +85,14 @@ def handle_order_created(event: OrderCreatedEvent):
         )
         
         if result.get("success"):
-            logger.info(f"Order notification sent for {event.order_id}")
+            logger.info("Order notification sent for %s", event.order_id)
             _log_notification(event, "order_confirmation", "sent")
         else:
-            logger.warning(f"Order notification failed for {event.order_id}: {result.get('error')}")
+            logger.warning("Order notification failed for %s: %s", event.order_id, result.get('error'))
             _log_notification(event, "order_confirmation", "failed", result.get("error"))
             
     except Exception as e:
-        logger.error(f"Error handling OrderCreatedEvent: {e}", exc_info=True)
+        logger.error("Error handling OrderCreatedEvent: %s", e, exc_info=True)
         _log_notification(event, "order_confirmation", "error", str(e))
 
 
@@ -88,7 +103,7 @@ def handle_order_rejected(event: OrderRejectedEvent):
     Args:
         event: OrderRejectedEvent instance
     """
-    logger.info(f"Handling OrderRejectedEvent for user: {event.user_id}")
+    logger.info("Handling OrderRejectedEvent for user: %s", event.user_id)
     
     try:
         # Send rejection notification
@@ -99,14 +114,14 @@ def handle_order_rejected(event: OrderRejectedEvent):
         )
         
         if result.get("success"):
-            logger.info(f"Rejection notification sent to {event.user_id}")
+            logger.info("Rejection notification sent to %s", event.user_id)
             _log_notification(event, "order_rejection", "sent")
         else:
-            logger.warning(f"Rejection notification failed for {event.user_id}: {result.get('error')}")
+            logger.warning("Rejection notification failed for %s: %s", event.user_id, result.get('error'))
             _log_notification(event, "order_rejection", "failed", result.get("error"))
             
     except Exception as e:
-        logger.error(f"Error handling OrderRejectedEvent: {e}", exc_info=True)
+        logger.error("Error handling OrderRejectedEvent: %s", e, exc_info=True)
         _log_notification(event, "order_rejection", "error", str(e))
 
 
@@ -117,7 +132,7 @@ def handle_prescription_validated(event: PrescriptionValidatedEvent):
     Args:
         event: PrescriptionValidatedEvent instance
     """
-    logger.info(f"Handling PrescriptionValidatedEvent for user: {event.user_id}")
+    logger.info("Handling PrescriptionValidatedEvent for user: %s", event.user_id)
     
     try:
         # Determine prescription status
@@ -143,14 +158,14 @@ def handle_prescription_validated(event: PrescriptionValidatedEvent):
         )
         
         if result.get("success"):
-            logger.info(f"Prescription status sent to {event.user_id}")
+            logger.info("Prescription status sent to %s", event.user_id)
             _log_notification(event, "prescription_status", "sent")
         else:
-            logger.warning(f"Prescription status failed for {event.user_id}: {result.get('error')}")
+            logger.warning("Prescription status failed for %s: %s", event.user_id, result.get('error'))
             _log_notification(event, "prescription_status", "failed", result.get("error"))
             
     except Exception as e:
-        logger.error(f"Error handling PrescriptionValidatedEvent: {e}", exc_info=True)
+        logger.error("Error handling PrescriptionValidatedEvent: %s", e, exc_info=True)
         _log_notification(event, "prescription_status", "error", str(e))
 
 
@@ -158,6 +173,248 @@ def handle_prescription_validated(event: PrescriptionValidatedEvent):
 # HELPER FUNCTIONS
 # ------------------------------------------------------------------
 
+# Resolved once at import instead of on every notification
+NOTIFICATION_LOG_DIR = Path(os.getcwd()) / "backend" / "logs"
+
+# Most entries the writer thread serializes and writes in one go
+LOG_BATCH_SIZE = 256
+
+# Event data/payload strings at least this long are interned into the string table
+INTERN_MIN_LENGTH = 32
+
+# Audit log format: "msgpack" (compact, default when installed) or "jsonl".
+# NOTIFICATION_LOG_JSONL=1 additionally mirrors entries to a JSONL file
+# for reading by hand.
+NOTIFICATION_LOG_FORMAT = os.getenv(
+    "NOTIFICATION_LOG_FORMAT", "msgpack" if HAS_MSGPACK else "jsonl"
+).lower()
+if NOTIFICATION_LOG_FORMAT == "msgpack" and not HAS_MSGPACK:
+    logger.warning("msgpack not installed, notification log falls back to JSONL")
+    NOTIFICATION_LOG_FORMAT = "jsonl"
+NOTIFICATION_LOG_JSONL = (
+    NOTIFICATION_LOG_FORMAT == "jsonl"
+    or os.getenv("NOTIFICATION_LOG_JSONL", "").lower() in ("1", "true", "yes")
+)
+
+
+class _LogWriter:
+    """
+    Appends encoded records to the current day's notification log.
+    
+    The file handle stays open between notifications and is only
+    reopened when the date rolls over. Today's date string is cached
+    until local midnight, so a write normally costs one float compare.
+    """
+    
+    def __init__(self, log_dir: Path, suffix: str):
+        self.log_dir = log_dir
+        self.suffix = suffix
+        self.date_str: Optional[str] = None
+        self.fh: Optional[BinaryIO] = None
+        self.lock = threading.Lock()
+        self._today = ""
+        self._rollover_at = 0.0  # Epoch seconds of the next local midnight
+    
+    def _current_date(self) -> str:
+        if time.time() >= self._rollover_at:
+            today = date.today()
+            self._today = today.isoformat()
+            self._rollover_at = datetime.combine(today + timedelta(days=1), dt_time.min).timestamp()
+        return self._today
+    
+    def write(self, data: bytes):
+        with self.lock:
+            today = self._current_date()
+            if today != self.date_str:
+                if self.fh is None:
+                    self.log_dir.mkdir(parents=True, exist_ok=True)
+                else:
+                    self.fh.close()
+                self.fh = open(
+                    self.log_dir / f"notifications_{today}.{self.suffix}", "ab", buffering=1 << 16
+                )
+                self.date_str = today
+            self.fh.write(data)
+            self.fh.flush()
+    
+    def close(self):
+        with self.lock:
+            if self.fh is not None:
+                self.fh.close()
+                self.fh = None
+                self.date_str = None
+
+
+class _StringTable:
+    """
+    Interns long, repeated strings from notification event payloads.
+    
+    Rejection reasons and templated texts ("Our pharmacist is reviewing...")
+    repeat across users, so each distinct string is stored once in a sidecar JSONL
+    file ({"id": n, "text": ...}) and log entries carry {"$str": n}
+    instead. Only the writer thread touches the table, so no lock.
+    """
+    
+    def __init__(self, path: Path):
+        self.path = path
+        self.ids: Optional[Dict[str, int]] = None  # Loaded on first use
+        self.next_id = 0
+        self.fh: Optional[BinaryIO] = None
+    
+    def _load(self) -> Dict[str, int]:
+        ids: Dict[str, int] = {}
+        try:
+            with open(self.path, "rb") as f:
+                for line in f:
+                    try:
+                        record = orjson.loads(line)
+                        ids[record["text"]] = record["id"]
+                    except (ValueError, KeyError) as e:  # orjson.JSONDecodeError is a ValueError
+                        logger.error("Skipping corrupt notification string table line: %s", e)
+        except FileNotFoundError:
+            pass
+        # Continue after the highest id seen so an existing reference is never reused
+        self.next_id = max(ids.values()) + 1 if ids else 0
+        return ids
+    
+    def intern(self, text: str) -> int:
+        ids = self.ids
+        if ids is None:
+            ids = self.ids = self._load()
+        string_id = ids.get(text)
+        if string_id is None:
+            string_id = ids[text] = self.next_id
+            self.next_id += 1
+            if self.fh is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self.fh = open(self.path, "ab")
+            self.fh.write(orjson.dumps({"id": string_id, "text": text}) + b"\n")
+        return string_id
+    
+    def intern_value(self, value: Any) -> Any:
+        """Return a copy of value with long strings replaced by references."""
+        if isinstance(value, str):
+            if len(value) >= INTERN_MIN_LENGTH:
+                return {"$str": self.intern(value)}
+            return value
+        if isinstance(value, dict):
+            return {k: self.intern_value(v) for k, v in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [self.intern_value(v) for v in value]
+        return value
+    
+    def flush(self):
+        # Called before each batch is written so references never dangle
+        if self.fh is not None:
+            self.fh.flush()
+    
+    def close(self):
+        if self.fh is not None:
+            self.fh.close()
+            self.fh = None
+
+
+_string_table = _StringTable(NOTIFICATION_LOG_DIR / "notification_strings.jsonl")
+
+_jsonl_writer = _LogWriter(NOTIFICATION_LOG_DIR, "jsonl") if NOTIFICATION_LOG_JSONL else None
+_msgpack_writer = (
+    _LogWriter(NOTIFICATION_LOG_DIR, "msgpack") if NOTIFICATION_LOG_FORMAT == "msgpack" else None
+)
+
+# Handlers only enqueue entries; one background thread serializes and
+# writes them in batches. None is the shutdown sentinel.
+_log_queue: "queue.SimpleQueue[Optional[Dict[str, Any]]]" = queue.SimpleQueue()
+_log_thread: Optional[threading.Thread] = None
+_log_thread_lock = threading.Lock()
+
+
+def _encode_msgpack(entry: Dict[str, Any]) -> bytes:
+    # Timestamp stays a raw epoch float: 9 bytes instead of a 26 char string
+    return msgpack.packb(entry, use_bin_type=True)
+
+
+def _encode_jsonl(entry: Dict[str, Any]) -> bytes:
+    # orjson renders the datetime in the same ISO format isoformat() produced
+    entry = {**entry, "timestamp": datetime.fromtimestamp(entry["timestamp"])}
+    return orjson.dumps(entry) + b"\n"
+
+
+def _write_batch(writer: _LogWriter, entries, encode):
+    """Encode entries and append them to writer's file in one write."""
+    records = []
+    for entry in entries:
+        try:
+            records.append(encode(entry))
+        except TypeError as e:  # Also covers orjson.JSONEncodeError
+            logger.error("Failed to serialize notification log entry: %s", e)
+    if records:
+        try:
+            writer.write(b"".join(records))
+        except Exception as e:
+            logger.error("Failed to write notification log: %s", e)
+
+
+def _drain_log_queue():
+    """Writer thread: block for an entry, then write everything queued."""
+    while True:
+        batch = [_log_queue.get()]
+        while len(batch) < LOG_BATCH_SIZE:
+            try:
+                batch.append(_log_queue.get_nowait())
+            except queue.Empty:
+                break
+        
+        entries = []
+        for entry in batch:
+            if entry is None:
+                continue
+            try:
+                entry["event_data"] = _string_table.intern_value(entry["event_data"])
+                entry["event_payload"] = _string_table.intern_value(entry["event_payload"])
+            except Exception as e:
+                # Keep the literal data rather than dropping the entry
+                logger.error("Failed to intern notification strings: %s", e)
+            entries.append(entry)
+        try:
+            _string_table.flush()
+        except OSError as e:
+            logger.error("Failed to write notification string table: %s", e)
+        if _msgpack_writer is not None:
+            _write_batch(_msgpack_writer, entries, _encode_msgpack)
+        if _jsonl_writer is not None:
+            _write_batch(_jsonl_writer, entries, _encode_jsonl)
+        
+        if None in batch:
+            return
+
+
+def _start_log_writer():
+    """Start the writer thread once."""
+    global _log_thread
+    if _log_thread is not None:
+        return
+    with _log_thread_lock:
+        if _log_thread is None:
+            _log_thread = threading.Thread(
+                target=_drain_log_queue, name="notification-log-writer", daemon=True
+            )
+            _log_thread.start()
+
+
+def _stop_log_writer():
+    """Flush queued entries and close the log file at interpreter exit."""
+    if _log_thread is not None:
+        _log_queue.put(None)
+        _log_thread.join(timeout=5)
+    for writer in (_msgpack_writer, _jsonl_writer):
+        if writer is not None:
+            writer.close()
+    _string_table.close()
+
+
+atexit.register(_stop_log_writer)
+
+
 def _log_notification(
     event: Event,
     notification_type: str,
@@ -167,52 +424,62 @@ def _log_notification(
     """
     Log notification to file for audit purposes.
     
+    Non-blocking and safe from any thread: this only enqueues the entry,
+    all encoding and file I/O happen on the writer thread. Handlers can
+    call it inline without offloading it to an executor.
+    
     Args:
         event: Event that triggered notification
         notification_type: Type of notification
         status: Status (sent | failed | error)
         error: Error message if failed
     """
-    # Create logs directory if it doesn't exist
-    import os
-    log_dir = Path(os.getcwd()) / "backend" / "logs"
-    log_dir.mkdir(parents=True, exist_ok=True)
-    
-    # Create log file path (one file per day)
-    log_file = log_dir / f"notifications_{datetime.now().strftime('%Y-%m-%d')}.jsonl"
-    
     # Prepare log entry
     log_entry = {
-        "timestamp": datetime.now().isoformat(),
-        "event_type": type(event).__name__,
+        "timestamp": time.time(),  # Formatted by the writer thread
+        "event_type": event.event_name,
         "event_id": event.event_id,
         "notification_type": notification_type,
         "status": status,
         "error": error,
-        "event_data": event.data
+        "event_data": event.data,
+        "event_payload": event.payload,  # order_id, reason, details, ...
     }
     
-    # Append to log file (JSONL format)
-    try:
-        with open(log_file, "a") as f:
-            f.write(json.dumps(log_entry) + "\n")
-    except Exception as e:
-        logger.error(f"Failed to write notification log: {e}")
+    # Hand off to the writer thread (today's file)
+    _start_log_writer()
+    _log_queue.put_nowait(log_entry)
 
 
 # ------------------------------------------------------------------
 # REGISTRATION
 # ------------------------------------------------------------------
 
+NOTIFICATION_HANDLERS = (
+    (OrderCreatedEvent, handle_order_created),
+    (OrderRejectedEvent, handle_order_rejected),
+    (PrescriptionValidatedEvent, handle_prescription_validated),
+)
+
+# Buses already wired up; weak so a reset bus can be collected
+_registered_buses: "weakref.WeakSet[EventBus]" = weakref.WeakSet()
+
+
 def register_notification_handlers(event_bus: EventBus):
     """
     Register all notification handlers with the event bus.
     
+    Safe to call repeatedly (main.py and build_graph both do); a bus
+    that is already registered is left untouched.
+    
     Args:
         event_bus: EventBus instance
     """
-    event_bus.subscribe(OrderCreatedEvent, handle_order_created)
-    event_bus.subscribe(OrderRejectedEvent, handle_order_rejected)
-    event_bus.subscribe(PrescriptionValidatedEvent, handle_prescription_validated)
+    if event_bus in _registered_buses:
+        return
+    for event_type, handler in NOTIFICATION_HANDLERS:
+        event_bus.subscribe(event_type, handler)
+    _registered_buses.add(event_bus)
+    _start_log_writer()
     
     logger.info("Notification handlers registered")
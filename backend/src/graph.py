@@ -8,6 +8,7 @@ START
   -> Medical Validation Agent (Safety + Compliance)
   -> Inventory Agent (Stock Check + Alternatives)
   -> Fulfillment Agent (Order Creation + Event Emission)
+  -> Persist Patient (single UPDATE for queued patient changes)
   -> END
 
 Routing Logic:
@@ -16,19 +17,21 @@ Routing Logic:
 - Inventory: no stock → END (emit rejection event)
 - Inventory: has stock → Fulfillment
 - Fulfillment: always → END (emit order created event)
+- Every END path passes through Persist Patient first
 
 Note: Notifications are now event-driven and decoupled from the graph.
 """
 
-from typing import Literal
+from functools import partial
+from typing import Literal, Optional
 from langgraph.graph import StateGraph, END
 
 from src.state import PharmacyState
 from src.agents.medical_validator_agent import medical_validation_agent
-from src.agents.risk_scoring_agent import run_risk_scoring_agent
+from src.agents.risk_scoring_agent import run_risk_scoring_agent, flush_patient_updates
 from src.agents.inventory_and_rules_agent import inventory_agent
 from src.agents.fulfillment_agent import fulfillment_agent
-from src.events.event_bus import get_event_bus
+from src.events.event_bus import EventBus, get_event_bus
 from src.events.event_types import OrderRejectedEvent
 from src.events.handlers.notification_handler import register_notification_handlers
 
@@ -36,66 +39,80 @@ from src.events.handlers.notification_handler import register_notification_handl
 # ------------------------------------------------------------------
 # ROUTING LOGIC
 # ------------------------------------------------------------------
-def route_after_validation(state: PharmacyState) -> Literal["risk_scoring", "end"]:
+# Static dispatch tables: anything not listed takes the default branch
+_VALIDATION_ROUTES = {"rejected": "end"}
+_RISK_ROUTES = {"critical": "end"}
+_INVENTORY_ROUTES = {0.0: "end"}
+
+
+def route_after_validation(
+    state: PharmacyState, event_bus: Optional[EventBus] = None
+) -> Literal["risk_scoring", "end"]:
     """
     Decide next step based on medical validation decision.
     
     - rejected: Emit rejection event and stop (safety concern)
     - continue to risk assessment
     """
-    if state.pharmacist_decision == "rejected":
+    next_step = _VALIDATION_ROUTES.get(state.pharmacist_decision, "risk_scoring")
+    if next_step == "end":
         # Emit rejection event
-        event_bus = get_event_bus()
+        event_bus = event_bus or get_event_bus()
         event = OrderRejectedEvent(
             user_id=state.user_id or "anonymous",
             reason="prescription_rejected",
             details={"safety_flags": state.safety_flags}
         )
         event_bus.publish(event)
-        return "end"
-    return "risk_scoring"
+    return next_step
 
 
-def route_after_risk_scoring(state: PharmacyState) -> Literal["inventory", "end"]:
+def route_after_risk_scoring(
+    state: PharmacyState, event_bus: Optional[EventBus] = None
+) -> Literal["inventory", "end"]:
     """
     Decide next step based on risk level.
     """
-    if state.risk_level == "critical":
+    next_step = _RISK_ROUTES.get(state.risk_level, "inventory")
+    if next_step == "end":
         # Order already blocked by risk_scoring_agent (pharmacist_decision=rejected)
-        event_bus = get_event_bus()
+        event_bus = event_bus or get_event_bus()
         event = OrderRejectedEvent(
             user_id=state.user_id or "anonymous",
             reason="critical_risk_blocked",
             details={"risk_score": state.risk_score, "factors": state.risk_factors_triggered}
         )
         event_bus.publish(event)
-        return "end"
-    return "inventory"
+    return next_step
 
 
-def route_after_inventory(state: PharmacyState) -> Literal["fulfillment", "end"]:
+def route_after_inventory(
+    state: PharmacyState, event_bus: Optional[EventBus] = None
+) -> Literal["fulfillment", "end"]:
     """
     Decide next step based on inventory availability.
     
     - No items available: Emit rejection event and stop
     - Some items available: Continue to fulfillment
     """
-    inventory_metadata = state.trace_metadata.get("inventory_agent", {})
-    availability_score = inventory_metadata.get("availability_score", 0.0)
+    try:
+        availability_score = state.trace_metadata["inventory_agent"]["availability_score"]
+    except KeyError:
+        availability_score = 0.0
     
-    if availability_score == 0.0:
+    next_step = _INVENTORY_ROUTES.get(availability_score, "fulfillment")
+    if next_step == "end":
         # Emit rejection event
-        event_bus = get_event_bus()
+        event_bus = event_bus or get_event_bus()
         event = OrderRejectedEvent(
             user_id=state.user_id or "anonymous",
             reason="no_stock_available",
             details={"availability_score": availability_score}
         )
         event_bus.publish(event)
-        return "end"
 
     # Safe Gate: Inventory done, proceed to fulfillment (which handles confirmation gate)
-    return "fulfillment"
+    return next_step
 
 
 # ------------------------------------------------------------------
@@ -119,42 +136,47 @@ def build_graph():
     graph.add_node("risk_scoring", run_risk_scoring_agent)
     graph.add_node("inventory", inventory_agent)
     graph.add_node("fulfillment", fulfillment_agent)
+    graph.add_node("persist_patient", flush_patient_updates)
 
     # --- Edges ---
+    # Routers get the bus bound here instead of resolving it per transition
     graph.set_entry_point("medical_validation")
 
     # Medical Validation → Risk Scoring (if approved/needs_review) or END (if rejected)
     graph.add_conditional_edges(
         "medical_validation",
-        route_after_validation,
+        partial(route_after_validation, event_bus=event_bus),
         {
             "risk_scoring": "risk_scoring",
-            "end": END,
+            "end": "persist_patient",
         },
     )
 
     # Risk Scoring → Inventory (if not critical) or END (if critical)
     graph.add_conditional_edges(
         "risk_scoring",
-        route_after_risk_scoring,
+        partial(route_after_risk_scoring, event_bus=event_bus),
         {
             "inventory": "inventory",
-            "end": END,
+            "end": "persist_patient",
         },
     )
 
     # Inventory → Fulfillment (if stock available) or END (if no stock)
     graph.add_conditional_edges(
         "inventory",
-        route_after_inventory,
+        partial(route_after_inventory, event_bus=event_bus),
         {
             "fulfillment": "fulfillment",
-            "end": END,
+            "end": "persist_patient",
         },
     )
 
-    # Fulfillment → END (events are emitted automatically)
-    graph.add_edge("fulfillment", END)
+    # Fulfillment → Persist Patient (events are emitted automatically)
+    graph.add_edge("fulfillment", "persist_patient")
+
+    # Persist Patient → END (one UPDATE + COMMIT for the whole turn)
+    graph.add_edge("persist_patient", END)
 
     return graph.compile()
 
@@ -1,42 +1,79 @@
 import asyncio
-from typing import Callable, Any, Dict, List
+import logging
+from typing import Callable, Any, Dict, List, Tuple
 from collections import defaultdict
 
 # Event Types
 PATIENT_IDENTIFIED = "PATIENT_IDENTIFIED"
 ORDER_COMPLETED = "ORDER_COMPLETED"
 
+logger = logging.getLogger(__name__)
+
+# Pending events per type before emit() waits for the worker to catch up
+EVENT_QUEUE_SIZE = 1024
+
 class EventManager:
     """
     Simple asynchronous event bus for decoupling components.
+    
+    Each event type gets its own queue and worker task (started on the
+    first emit, inside the running loop); emit() only enqueues.
     """
     
     def __init__(self):
-        self._subscribers: Dict[str, List[Callable[[Any], Any]]] = defaultdict(list)
+        # (callback, is_coroutine_function) pairs, classified once at subscribe
+        self._subscribers: Dict[str, List[Tuple[Callable[[Any], Any], bool]]] = defaultdict(list)
+        self._workers: Dict[str, Tuple[asyncio.Queue, asyncio.Task]] = {}
 
     def subscribe(self, event_type: str, callback: Callable[[Any], Any]):
         """Subscribe to an event type."""
-        self._subscribers[event_type].append(callback)
-        print(f"EVENT: Subscribed to {event_type} -> {callback.__name__}")
+        self._subscribers[event_type].append((callback, asyncio.iscoroutinefunction(callback)))
+        logger.debug("EVENT: Subscribed to %s -> %s", event_type, callback.__name__)
 
     async def emit(self, event_type: str, data: Any):
         """Emit an event to all subscribers."""
         if event_type not in self._subscribers:
             return
         
-        print(f"EVENT: Emitting {event_type} with data: {data}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("EVENT: Emitting %s with data: %s", event_type, data)
         
-        tasks = []
-        for callback in self._subscribers[event_type]:
-            if asyncio.iscoroutinefunction(callback):
-                tasks.append(asyncio.create_task(callback(data)))
-            else:
-                # Run synchronous callbacks in executor to avoid blocking loop
-                loop = asyncio.get_running_loop()
-                tasks.append(loop.run_in_executor(None, callback, data))
+        await self._get_queue(event_type).put(data)
+
+    def _get_queue(self, event_type: str) -> asyncio.Queue:
+        """Return the event type's queue, (re)starting its worker in the current loop."""
+        worker = self._workers.get(event_type)
+        if (
+            worker is None
+            or worker[1].done()
+            or worker[1].get_loop() is not asyncio.get_running_loop()
+        ):
+            queue: asyncio.Queue = asyncio.Queue(maxsize=EVENT_QUEUE_SIZE)
+            task = asyncio.create_task(self._run_worker(event_type, queue))
+            worker = self._workers[event_type] = (queue, task)
+        return worker[0]
+
+    async def _run_worker(self, event_type: str, queue: asyncio.Queue):
+        """
+        Deliver queued events of one type to its subscribers, in order.
         
-        if tasks:
-            await asyncio.gather(*tasks, return_exceptions=True)
+        Sync callbacks are expected to be short and run inline; async
+        callbacks are awaited together.
+        """
+        while True:
+            data = await queue.get()
+            coros = []
+            for callback, is_coro in self._subscribers[event_type]:
+                if is_coro:
+                    coros.append(callback(data))
+                    continue
+                try:
+                    callback(data)
+                except Exception:
+                    logger.exception("EVENT: %s callback %s failed", event_type, callback.__name__)
+            
+            if coros:
+                await asyncio.gather(*coros, return_exceptions=True)
 
 # Global instance
 event_manager = EventManager()
@@ -6,24 +6,81 @@ SQLAlchemy models for SQLite (dev) and PostgreSQL/Supabase (prod).
 Migration path: SQLite → Supabase PostgreSQL
 """
 
-from datetime import datetime
-from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, JSON, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, JSON, ForeignKey, Text, Index
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, validates
+from sqlalchemy.sql.expression import FunctionElement
 
 Base = declarative_base()
 
 
+class utcnow(FunctionElement):
+    """
+    Current UTC time, evaluated by the database.
+    
+    Used as a SQL default so timestamps are stamped inside the INSERT or
+    UPDATE itself instead of calling datetime.utcnow() per row. Also
+    set as server_default so fresh tables get the same DDL default.
+    """
+    type = DateTime()
+    inherit_cache = True
+
+
+@compiles(utcnow)
+def _compile_utcnow(element, compiler, **kw):
+    # SQLite's CURRENT_TIMESTAMP is already UTC
+    return "CURRENT_TIMESTAMP"
+
+
+@compiles(utcnow, "postgresql")
+def _compile_utcnow_postgresql(element, compiler, **kw):
+    # Naive UTC, matching the naive datetime.utcnow() values already stored
+    return "TIMEZONE('utc', CURRENT_TIMESTAMP)"
+
+
+class seconds_since(FunctionElement):
+    """
+    Whole seconds from a naive-UTC timestamp column to now, on the DB clock.
+    
+    Usage: seconds_since(Order.created_at)
+    """
+    type = Integer()
+    inherit_cache = True
+
+
+@compiles(seconds_since)
+def _compile_seconds_since(element, compiler, **kw):
+    (column,) = element.clauses
+    return "(CAST(strftime('%s', 'now') AS INTEGER) - CAST(strftime('%s', {}) AS INTEGER))".format(
+        compiler.process(column, **kw)
+    )
+
+
+@compiles(seconds_since, "postgresql")
+def _compile_seconds_since_postgresql(element, compiler, **kw):
+    (column,) = element.clauses
+    return "CAST(EXTRACT(EPOCH FROM (TIMEZONE('utc', CURRENT_TIMESTAMP) - {})) AS INTEGER)".format(
+        compiler.process(column, **kw)
+    )
+
+
+def normalize_medicine_name(name: str) -> str:
+    """Canonical form used for indexed, case-insensitive name lookups."""
+    return name.strip().lower()
+
+
 class Medicine(Base):
     """Medicine/Product catalog."""
     __tablename__ = "medicines"
     
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(255), index=True, nullable=False)
+    name_norm = Column(String(255), index=True)  # lower(trim(name)), kept in sync below
     category = Column(String(100))
     manufacturer = Column(String(255))
     price = Column(Float, nullable=False)
-    stock = Column(Integer, default=0)
+    stock = Column(Integer, default=0, index=True)  # Low-stock dashboard count
     requires_prescription = Column(Boolean, default=False)
     description = Column(Text)
     
@@ -46,21 +103,32 @@ class Medicine(Base):
     atc_level_4 = Column(String(5))  # Chemical subgroup
     
     # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, default=utcnow(), server_default=utcnow())
+    updated_at = Column(DateTime, default=utcnow(), server_default=utcnow(), onupdate=utcnow())
     
     # Relationships
     order_items = relationship("OrderItem", back_populates="medicine")
     symptom_mappings = relationship("SymptomMedicineMapping", back_populates="medicine")
+    
+    @validates("name")
+    def _sync_name_norm(self, key, value):
+        self.name_norm = normalize_medicine_name(value) if value is not None else None
+        return value
 
 
 class Order(Base):
     """Customer orders."""
     __tablename__ = "orders"
+    __table_args__ = (
+        # Order history per user, newest first (also covers user_id lookups)
+        Index("ix_orders_user_created", "user_id", "created_at"),
+        # Admin queue: pending orders oldest first
+        Index("ix_orders_status_created", "status", "created_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     order_id = Column(String(50), unique=True, index=True, nullable=False)
-    user_id = Column(String(100), index=True)
+    user_id = Column(String(100))
     
     # Order status
     status = Column(String(50), default="pending")  # pending, fulfilled, cancelled
@@ -77,8 +145,8 @@ class Order(Base):
     total_amount = Column(Float, default=0.0)
     
     # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, default=utcnow(), server_default=utcnow())
+    updated_at = Column(DateTime, default=utcnow(), server_default=utcnow(), onupdate=utcnow())
     
     # Relationships
     items = relationship("OrderItem", back_populates="order", cascade="all, delete-orphan")
@@ -90,7 +158,7 @@ class OrderItem(Base):
     __tablename__ = "order_items"
     
     id = Column(Integer, primary_key=True, index=True)
-    order_id = Column(Integer, ForeignKey("orders.id"), nullable=False)
+    order_id = Column(Integer, ForeignKey("orders.id"), index=True, nullable=False)
     medicine_id = Column(Integer, ForeignKey("medicines.id"), nullable=False)
     
     # Item details
@@ -109,7 +177,7 @@ class AuditLog(Base):
     __tablename__ = "audit_logs"
     
     id = Column(Integer, primary_key=True, index=True)
-    order_id = Column(Integer, ForeignKey("orders.id"), nullable=False)
+    order_id = Column(Integer, ForeignKey("orders.id"), index=True, nullable=False)
     
     # Agent info
     agent_name = Column(String(100), nullable=False)  # front_desk, pharmacist, etc.
@@ -121,7 +189,7 @@ class AuditLog(Base):
     extra_data = Column(JSON)  # Additional context (renamed from metadata)
     
     # Timestamp
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=utcnow(), server_default=utcnow())
     
     # Relationships
     order = relationship("Order", back_populates="audit_logs")
@@ -143,18 +211,18 @@ class Patient(Base):
     # Order history metadata
     total_orders = Column(Integer, default=0)
     last_order_date = Column(DateTime)
-    last_visit = Column(DateTime, default=datetime.utcnow)  # Track engagement
+    last_visit = Column(DateTime, default=utcnow(), server_default=utcnow(), index=True)  # Track engagement
     
     # NEW: Behavioral Risk Tracking
     risk_score = Column(Integer, default=0)           # 0-100 cumulative risk
     risk_level = Column(String(20), default="normal") # normal | elevated | high | critical
     risk_flags = Column(JSON, default=list)           # List of triggered risk factors
-    risk_updated_at = Column(DateTime, default=datetime.utcnow)
+    risk_updated_at = Column(DateTime, default=utcnow(), server_default=utcnow())
     flagged_for_review = Column(Boolean, default=False)
     
     # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, default=utcnow(), server_default=utcnow())
+    updated_at = Column(DateTime, default=utcnow(), server_default=utcnow(), onupdate=utcnow())
 
 
 class DrugCombination(Base):
@@ -171,7 +239,7 @@ class DrugCombination(Base):
     guideline_source = Column(String(50))
     rationale = Column(Text)
     
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=utcnow(), server_default=utcnow())
 
 
 class ContraindicationRule(Base):
@@ -185,7 +253,7 @@ class ContraindicationRule(Base):
     alternative_atc_suggestion = Column(String(7))
     evidence_reference = Column(Text)
     
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=utcnow(), server_default=utcnow())
 
 
 class ReasoningLog(Base):
@@ -204,13 +272,17 @@ class ReasoningLog(Base):
     llm_prompt = Column(Text)
     llm_response = Column(Text)
     
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=utcnow(), server_default=utcnow())
 
 
 # For future: Proactive intelligence
 class RefillPrediction(Base):
     """Predicted refill dates for proactive reminders."""
     __tablename__ = "refill_predictions"
+    __table_args__ = (
+        # Unsent reminders by depletion date (admin refill alerts)
+        Index("ix_refill_predictions_sent_depletion", "reminder_sent", "predicted_depletion_date"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(String(100), index=True, nullable=False)
@@ -223,17 +295,21 @@ class RefillPrediction(Base):
     refill_confirmed = Column(Boolean, default=False)
     
     # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, default=utcnow(), server_default=utcnow())
+    updated_at = Column(DateTime, default=utcnow(), server_default=utcnow(), onupdate=utcnow())
 
 
 # NEW: Symptom to Medicine Mapping
 class SymptomMedicineMapping(Base):
     """Maps symptoms to recommended medicines."""
     __tablename__ = "symptom_medicine_mapping"
+    __table_args__ = (
+        # Symptom lookups, resolved to medicines from the index alone
+        Index("ix_symptom_medicine_symptom_medicine", "symptom", "medicine_id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
-    symptom = Column(String(255), index=True, nullable=False)  # e.g., "headache", "fever"
+    symptom = Column(String(255), nullable=False)  # e.g., "headache", "fever"
     medicine_id = Column(Integer, ForeignKey("medicines.id"), nullable=False)
     
     # Relevance scoring
@@ -243,7 +319,7 @@ class SymptomMedicineMapping(Base):
     notes = Column(Text)  # Additional guidance (e.g., "for mild cases only")
     
     # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=utcnow(), server_default=utcnow())
     
     # Relationships
     medicine = relationship("Medicine", back_populates="symptom_mappings")
@@ -284,8 +360,8 @@ class ConversationSession(Base):
     turn_count = Column(Integer, default=0)
     
     # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, default=utcnow(), server_default=utcnow())
+    updated_at = Column(DateTime, default=utcnow(), server_default=utcnow(), onupdate=utcnow())
     
     # Relationships
     messages = relationship("ConversationMessage", back_populates="session", cascade="all, delete-orphan")
@@ -304,7 +380,7 @@ class Payment(Base):
     transaction_id = Column(String(100))
     qr_code_data = Column(Text) # Base64 Data URI
     paid_at = Column(DateTime)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=utcnow(), server_default=utcnow())
     
     # Relationships
     order = relationship("Order", backref="payments")
@@ -320,7 +396,7 @@ class Notification(Base):
     recipient = Column(String(50))
     content = Column(Text)
     status = Column(String(20)) # sent, delivered, failed
-    sent_at = Column(DateTime, default=datetime.utcnow)
+    sent_at = Column(DateTime, default=utcnow(), server_default=utcnow())
     error_log = Column(Text)
     
     # Relationships
@@ -331,6 +407,10 @@ class Notification(Base):
 class ConversationMessage(Base):
     """Individual messages in a conversation."""
     __tablename__ = "conversation_messages"
+    __table_args__ = (
+        # Session transcript in order
+        Index("ix_conversation_messages_session_created", "session_id", "created_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     session_id = Column(Integer, ForeignKey("conversation_sessions.id"), nullable=False)
@@ -346,7 +426,7 @@ class ConversationMessage(Base):
     extra_data = Column(JSON)  # Structured data (e.g., medicine recommendations)
     
     # Timestamp
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=utcnow(), server_default=utcnow())
     
     # Relationships
     session = relationship("ConversationSession", back_populates="messages")
\ No newline at end of file
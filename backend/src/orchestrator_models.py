@@ -1,14 +1,15 @@
 from dataclasses import dataclass
-from typing import Optional, Dict, Any
+from typing import Optional, Tuple
 
-@dataclass
+# Frozen and slotted: hashable snapshots, so consumers can memoize on them
+@dataclass(slots=True, frozen=True)
 class FusionState:
     session_id: str
     safety_confidence: float        # 0.0 - 1.0
     fulfillment_confidence: float   # 0.0 - 1.0
     dominant_mode: str              # "safety" | "fulfillment"
     pipeline_phase: str             # "intake" | "validation" | "inventory" | "fulfillment" | "complete" | "halted"
-    contributing_scores: Dict[str, Any]  # breakdown of what fed into each score
+    contributing_scores: Tuple[Tuple[str, Optional[float]], ...]  # (score name, value) breakdown of what fed into each score
     last_event_agent: str
     last_event_type: str
     alert_level: str                # "nominal" | "warn" | "critical"
@@ -4,6 +4,8 @@ CLINICAL REASONING PROMPTS V2
 System prompts for the evidence-based clinical reasoning agent.
 """
 
+from string import Formatter
+
 CLINICAL_SYSTEM_PROMPT = """
 You are MediSync Clinical Reasoner, an expert digital clinical pharmacist.
 Your role is to evaluate patient requests for medication through a strict, evidence-based clinical lens, adhering to WHO Essential Medicines and standard clinical guidelines.
@@ -64,3 +66,33 @@ If crucial information is missing (e.g., patient is asking for a strong painkill
 
 Focus purely on clinical reasoning!
 """
+
+
+def _compile_template(template: str):
+    """
+    Split a str.format template into literal chunks and field names once.
+    
+    Returns a render(**fields) function equivalent to template.format(**fields)
+    for plain {name} placeholders, without re-parsing the template (and its
+    escaped JSON braces) on every call.
+    """
+    parts = []
+    for literal, field, spec, conversion in Formatter().parse(template):
+        if spec or conversion:
+            raise ValueError(f"Unsupported placeholder in prompt template: {field}")
+        if literal:
+            parts.append((literal, None))
+        if field is not None:
+            parts.append((None, field))
+    parts = tuple(parts)
+
+    def render(**fields) -> str:
+        return "".join(
+            literal if field is None else str(fields[field])
+            for literal, field in parts
+        )
+
+    return render
+
+
+render_clinical_system_prompt = _compile_template(CLINICAL_SYSTEM_PROMPT)
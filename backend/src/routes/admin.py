@@ -1,17 +1,33 @@
-from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketDisconnect
-from sqlalchemy.orm import Session
-from datetime import datetime, date
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from sqlalchemy import String, case, cast, func, select
+from sqlalchemy.orm import Session, selectinload
+from datetime import datetime, date, timedelta
+from functools import lru_cache
 from typing import List, Dict, Optional, Any
 from pydantic import BaseModel
 
+import orjson
+
 import src.db_config
-from src.db_config import get_db_context
-from src.models import Order, Medicine, Patient, OrderItem, RefillPrediction
+from src.models import Order, OrderItem, Medicine, Patient, RefillPrediction, seconds_since
 from src.database import Database
 from src.services.admin_realtime_service import admin_realtime_manager
+from src.utils.ttl_cache import TTLCache, MISS
 
 router = APIRouter(tags=["admin"])
 
+# Dashboard stats barely change second to second, so repeat loads are served
+# from memory. Admin writes below invalidate at once; orders and visits from
+# the patient-facing flows show up within the TTL.
+ADMIN_STATS_TTL_SECONDS = 60
+_admin_stats_cache = TTLCache(maxsize=8, ttl_seconds=ADMIN_STATS_TTL_SECONDS)
+
+
+def invalidate_admin_stats_cache() -> None:
+    """Drop the cached /stats response (call after admin-side writes)."""
+    _admin_stats_cache.clear()
+
 # --- Schemas ---
 
 class StatCard(BaseModel):
@@ -25,34 +41,73 @@ class AdminDashboardStats(BaseModel):
 class OrderActionRequest(BaseModel):
     status: str  # approved, rejected
 
+@lru_cache(maxsize=2048)
+def _fmt_date(d: date) -> str:
+    """'Oct 18, 2026'. Rows cluster on few distinct days, so cache per date."""
+    return d.strftime("%b %d, %Y")
+
+# --- Pagination ---
+
+# Listing endpoints return everything unless ?limit= is given (the admin UI
+# filters client-side); a full page sets X-Next-Offset for the next request.
+MAX_PAGE_SIZE = 500
+EXPORT_BATCH_SIZE = 500
+
+
+def _paginate(query, response: Response, limit: Optional[int], offset: int):
+    """Apply optional limit/offset to query and advertise the next page."""
+    if offset:
+        query = query.offset(offset)
+    if limit is None:
+        return query.all()
+    rows = query.limit(limit).all()
+    if len(rows) == limit:
+        response.headers["X-Next-Offset"] = str(offset + limit)
+    return rows
+
 # --- Endpoints ---
 
 @router.get("/stats")
 def get_admin_stats():
+    cached = _admin_stats_cache.get("admin_stats")
+    if cached is not MISS:
+        return cached
+    
     with src.db_config.get_db_context() as db:
-        # 1. Total Orders
-        total_orders = db.query(Order).count()
-        
-        # 2. Pending Orders
-        pending_orders = db.query(Order).filter(Order.status == "pending").count()
-        
-        # 3. Low Stock Items
-        low_stock_items = db.query(Medicine).filter(Medicine.stock < 10).count()
-        
-        # 4. Patients Today
-        today = date.today()
-        patients_today = db.query(Patient).filter(
-            Patient.last_visit >= datetime.combine(today, datetime.min.time())
-        ).count()
+        # 1-4. Headline counts, as scalar subqueries of one SELECT (one round trip)
+        today_start = datetime.combine(date.today(), datetime.min.time())
+        total_orders, pending_orders, low_stock_items, patients_today = db.execute(
+            select(
+                # 1. Total Orders
+                select(func.count(Order.id)).scalar_subquery(),
+                # 2. Pending Orders
+                select(func.count(Order.id)).where(Order.status == "pending").scalar_subquery(),
+                # 3. Low Stock Items
+                select(func.count(Medicine.id)).where(Medicine.stock < 10).scalar_subquery(),
+                # 4. Patients Today
+                select(func.count(Patient.id)).where(Patient.last_visit >= today_start).scalar_subquery(),
+            )
+        ).one()
         
         # 5. Recent Activity (Latest 5 orders)
-        recent_orders = db.query(Order).order_by(Order.created_at.desc()).limit(5).all()
+        recent_orders = (
+            db.query(Order)
+            .options(selectinload(Order.items))
+            .order_by(Order.created_at.desc())
+            .limit(5)
+            .all()
+        )
+        # One batched patient lookup instead of one query per order
+        user_ids = {order.user_id for order in recent_orders if order.user_id}
+        patient_map = {
+            p.user_id: p
+            for p in db.query(Patient).filter(Patient.user_id.in_(user_ids)).all()
+        } if user_ids else {}
         activity = []
         for order in recent_orders:
-            patient = db.query(Patient).filter(Patient.user_id == order.user_id).first()
+            patient = patient_map.get(order.user_id)
             # Get first medicine name for display
-            first_item = db.query(OrderItem).filter(OrderItem.order_id == order.id).first()
-            med_name = first_item.medicine_name if first_item else "Unknown"
+            med_name = order.items[0].medicine_name if order.items else "Unknown"
             
             activity.append({
                 "id": order.order_id,
@@ -62,7 +117,7 @@ def get_admin_stats():
                 "time": order.created_at.strftime("%I:%M %p")
             })
             
-        return {
+        result = {
             "stats": [
                 {"label": "TOTAL ORDERS", "value": total_orders},
                 {"label": "PENDING ORDERS", "value": pending_orders},
@@ -71,11 +126,17 @@ def get_admin_stats():
             ],
             "recent_activity": activity
         }
+        _admin_stats_cache.set("admin_stats", result)
+        return result
 
 @router.get("/inventory")
-def get_admin_inventory():
+def get_admin_inventory(
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    offset: int = Query(0, ge=0),
+):
     with src.db_config.get_db_context() as db:
-        medicines = db.query(Medicine).all()
+        medicines = _paginate(db.query(Medicine).order_by(Medicine.id), response, limit, offset)
         return [
             {
                 "id": m.id,
@@ -89,9 +150,13 @@ def get_admin_inventory():
         ]
 
 @router.get("/customers")
-def get_admin_customers():
+def get_admin_customers(
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    offset: int = Query(0, ge=0),
+):
     with src.db_config.get_db_context() as db:
-        patients = db.query(Patient).all()
+        patients = _paginate(db.query(Patient).order_by(Patient.id), response, limit, offset)
         result = []
         for p in patients:
             # Mask phone for privacy in UI
@@ -101,60 +166,104 @@ def get_admin_customers():
             result.append({
                 "id": p.user_id,
                 "phone": masked_phone,
-                "registered": p.created_at.strftime("%b %d, %Y") if p.created_at else "N/A",
+                "registered": _fmt_date(p.created_at.date()) if p.created_at else "N/A",
                 "orders": p.total_orders or 0,
-                "lastVisit": p.last_visit.strftime("%b %d, %Y") if p.last_visit else "N/A"
+                "lastVisit": _fmt_date(p.last_visit.date()) if p.last_visit else "N/A"
             })
         return result
 
+def _items_summary_subquery():
+    """
+    Per-order "Name (2x), Other (1x)" summary, aggregated in SQL.
+    
+    aggregate_strings compiles to string_agg on PostgreSQL and
+    group_concat on SQLite, so orders come back with their summary in
+    the same query instead of loading every OrderItem row.
+    """
+    label = OrderItem.medicine_name + " (" + cast(OrderItem.quantity, String) + "x)"
+    return (
+        select(
+            OrderItem.order_id,
+            func.aggregate_strings(label, ", ").label("summary"),
+        )
+        .group_by(OrderItem.order_id)
+        .subquery()
+    )
+
+
+def _with_items_summary(db: Session, *columns):
+    """Query (Order, summary, *columns), orders without items included."""
+    summary = _items_summary_subquery()
+    return (
+        db.query(Order, summary.c.summary, *columns)
+        .outerjoin(summary, summary.c.order_id == Order.id)
+    )
+
+
+def _admin_orders_query(db: Session):
+    return _with_items_summary(db).order_by(Order.created_at.desc(), Order.id.desc())
+
+
+def _order_row(o: Order, meds_summary: Optional[str]) -> Dict[str, Any]:
+    return {
+        "id": o.order_id,
+        "patient": o.user_id,
+        "medicines": meds_summary or "",
+        "total": f"${o.total_amount:.2f}",
+        "status": o.status.upper(),
+        "date": _fmt_date(o.created_at.date()) if o.created_at else "N/A"
+    }
+
 @router.get("/orders")
-def get_admin_orders():
+def get_admin_orders(
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    offset: int = Query(0, ge=0),
+):
     with src.db_config.get_db_context() as db:
-        orders = db.query(Order).order_by(Order.created_at.desc()).all()
-        result = []
-        for o in orders:
-            items = db.query(OrderItem).filter(OrderItem.order_id == o.id).all()
-            meds_summary = ", ".join([f"{i.medicine_name} ({i.quantity}x)" for i in items])
-            
-            result.append({
-                "id": o.order_id,
-                "patient": o.user_id,
-                "medicines": meds_summary,
-                "total": f"${o.total_amount:.2f}",
-                "status": o.status.upper(),
-                "date": o.created_at.strftime("%b %d, %Y") if o.created_at else "N/A"
-            })
-        return result
+        orders = _paginate(_admin_orders_query(db), response, limit, offset)
+        return [_order_row(o, summary) for o, summary in orders]
+
+@router.get("/orders/export")
+def export_admin_orders():
+    """Every order as JSON lines, read in batches so memory stays flat."""
+    def generate():
+        with src.db_config.get_db_context() as db:
+            for o, summary in _admin_orders_query(db).yield_per(EXPORT_BATCH_SIZE):
+                yield orjson.dumps(_order_row(o, summary)) + b"\n"
+    
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+def _format_wait(seconds: int) -> str:
+    """Compact waiting time: '2d 3h', '4h 12m' or '7m'."""
+    days, remainder = divmod(max(seconds, 0), 86400)
+    hours, remainder = divmod(remainder, 3600)
+    minutes = remainder // 60
+    if days > 0:
+        return f"{days}d {hours}h"
+    if hours > 0:
+        return f"{hours}h {minutes}m"
+    return f"{minutes}m"
 
 @router.get("/pending")
 def get_admin_pending():
     with src.db_config.get_db_context() as db:
-        orders = db.query(Order).filter(Order.status == "pending").order_by(Order.created_at.asc()).all()
+        # Waiting time is computed by the database against its own clock
+        orders = (
+            _with_items_summary(db, seconds_since(Order.created_at))
+            .filter(Order.status == "pending")
+            .order_by(Order.created_at.asc())
+            .all()
+        )
         result = []
-        now = datetime.utcnow()
-        for o in orders:
-            items = db.query(OrderItem).filter(OrderItem.order_id == o.id).all()
-            meds_summary = ", ".join([f"{i.medicine_name} ({i.quantity}x)" for i in items])
-            
-            # Calculate waiting time
-            wait_time = "N/A"
-            if o.created_at:
-                diff = now - o.created_at
-                days = diff.days
-                hours, remainder = divmod(diff.seconds, 3600)
-                minutes, _ = divmod(remainder, 60)
-                if days > 0:
-                    wait_time = f"{days}d {hours}h"
-                elif hours > 0:
-                    wait_time = f"{hours}h {minutes}m"
-                else:
-                    wait_time = f"{minutes}m"
+        for o, meds_summary, age_seconds in orders:
+            wait_time = _format_wait(age_seconds) if age_seconds is not None else "N/A"
             
             result.append({
                 "id": o.order_id,
                 "patient": o.user_id,
                 "waiting": wait_time,
-                "medicines": meds_summary
+                "medicines": meds_summary or ""
             })
         return result
 
@@ -173,6 +282,7 @@ def order_action(order_id: str, req: OrderActionRequest):
             raise HTTPException(status_code=400, detail="Invalid status")
             
         db.commit()
+        invalidate_admin_stats_cache()
         return {"status": "success", "new_status": order.status}
 
 # --- Inventory CRUD Schemas ---
@@ -198,6 +308,7 @@ async def add_medicine_endpoint(req: MedicineSchema):
     db_manager = Database()
     try:
         med_id = db_manager.add_medicine(req.model_dump())
+        invalidate_admin_stats_cache()
         # Broadcast real-time update
         await admin_realtime_manager.broadcast({
             "type": "STOCK_UPDATED",
@@ -214,6 +325,7 @@ async def update_medicine_endpoint(med_id: int, req: MedicineSchema):
     success = db_manager.update_medicine(med_id, req.model_dump())
     if not success:
         raise HTTPException(status_code=404, detail="Medicine not found")
+    invalidate_admin_stats_cache()
     
     # Broadcast real-time update
     await admin_realtime_manager.broadcast({
@@ -231,6 +343,7 @@ async def delete_medicine_endpoint(med_id: int):
     success = db_manager.delete_medicine(med_id)
     if not success:
         raise HTTPException(status_code=404, detail="Medicine not found")
+    invalidate_admin_stats_cache()
     
     await admin_realtime_manager.broadcast({"type": "STOCK_UPDATED"})
     return {"status": "success"}
@@ -242,23 +355,27 @@ async def delete_medicine_endpoint(med_id: int):
 @router.get("/refill-alerts")
 def get_refill_alerts():
     """Return all unsent refill predictions sorted by urgency."""
-    with get_db_context() as db:
-        predictions = db.query(RefillPrediction).filter(
-            RefillPrediction.reminder_sent == False
-        ).order_by(RefillPrediction.predicted_depletion_date.asc()).all()
+    now = datetime.now()
+    depletion = RefillPrediction.predicted_depletion_date
+    # days_left <= N  <=>  depletion < now + (N + 1) days, so urgency is a
+    # plain range comparison the database can answer from the index
+    is_urgent = depletion < now + timedelta(days=4)
+    urgency_col = case(
+        (is_urgent, "urgent"),
+        (depletion < now + timedelta(days=8), "soon"),
+        else_="normal",
+    ).label("urgency")
+    urgent_count = func.count(case((is_urgent, 1))).over().label("urgent_count")
+
+    with src.db_config.get_db_context() as db:
+        rows = db.query(RefillPrediction, urgency_col, urgent_count).filter(
+            RefillPrediction.reminder_sent == False,
+            depletion.isnot(None),
+        ).order_by(depletion.asc()).all()
 
-        now = datetime.now()
         alerts = []
-        for p in predictions:
-            if not p.predicted_depletion_date:
-                continue
+        for p, urgency, _ in rows:
             days_left = (p.predicted_depletion_date - now).days
-            if days_left <= 3:
-                urgency = "urgent"
-            elif days_left <= 7:
-                urgency = "soon"
-            else:
-                urgency = "normal"
             alerts.append({
                 "user_id": p.user_id,
                 "medicine_name": p.medicine_name,
@@ -273,7 +390,7 @@ def get_refill_alerts():
         return {
             "alerts": alerts,
             "total": len(alerts),
-            "urgent_count": sum(1 for a in alerts if a["urgency"] == "urgent")
+            "urgent_count": rows[0].urgent_count if rows else 0
         }
 
 
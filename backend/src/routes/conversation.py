@@ -26,7 +26,7 @@ from src.graph import agent_graph
 from src.agents.fulfillment_agent import format_order_confirmation, fulfillment_agent
 from src.services.confirmation_store import confirmation_store
 from src.errors import ConfirmationRequiredError
-from src.agents.risk_scoring_agent import run_risk_scoring_agent
+from src.agents.risk_scoring_agent import run_risk_scoring_agent, flush_patient_updates
 
 # FIX BUG 1: Initialize logger
 logger = logging.getLogger(__name__)
@@ -392,7 +392,7 @@ async def send_message(request: ConversationRequest):
                         # Ensure whatsapp_phone is in the state
                         pending_state.whatsapp_phone = pending_state.whatsapp_phone or session.get("whatsapp_phone")
                         
-                        final_state = fulfillment_agent(pending_state)
+                        final_state = flush_patient_updates(fulfillment_agent(pending_state))
                         response_message = format_order_confirmation(final_state)
                         conversation_service.transition_phase(
                             request.session_id, "completed"
@@ -943,7 +943,7 @@ Red Flags Detected:
                 # Extract quantities/dosages the user may have specified
                 extracted = front_desk_agent.extract_medicine_items(request.message)
                 extracted_map = {
-                    item.medicine_name.lower(): item for item in extracted
+                    item.medicine_name_lower: item for item in extracted
                 }
                 order_items = []
                 for r in recommendations:
@@ -966,6 +966,7 @@ Red Flags Detected:
                 
                 # Run Risk Scoring
                 state = run_risk_scoring_agent(state)
+                state = flush_patient_updates(state)
                 
                 state.trace_metadata["front_desk"] = {"patient_context": patient_context}
 
@@ -1309,6 +1310,7 @@ Red Flags Detected:
                     
                     # Run Risk Scoring
                     state = run_risk_scoring_agent(state)
+                    state = flush_patient_updates(state)
                     
                     state.trace_metadata["front_desk"] = {"patient_context": patient_context}
 
@@ -1645,7 +1647,7 @@ async def confirm_order(request: ConfirmOrderRequest):
     )
 
     try:
-        final_state = fulfillment_agent(pending_state)
+        final_state = flush_patient_updates(fulfillment_agent(pending_state))
         response_message = format_order_confirmation(final_state)
         conversation_service.transition_phase(request.session_id, "completed")
 
@@ -1801,7 +1803,7 @@ async def voice_input(
                     conversation_service.transition_phase(session_id, "fulfillment_executing")
                     
                     try:
-                        final_state = fulfillment_agent(pending_state)
+                        final_state = flush_patient_updates(fulfillment_agent(pending_state))
                         response_message = format_order_confirmation(final_state)
                         conversation_service.transition_phase(session_id, "completed")
                         
@@ -48,10 +48,10 @@ class CartManager:
         current_cart = self.get_cart(session_id)
         
         # Map for quick lookup
-        cart_map = {item.medicine_name.lower(): item for item in current_cart}
+        cart_map = {item.medicine_name_lower: item for item in current_cart}
         
         for new_item in new_items:
-            key = new_item.medicine_name.lower()
+            key = new_item.medicine_name_lower
             if key in cart_map:
                 # Increment quantity
                 cart_map[key].quantity += new_item.quantity
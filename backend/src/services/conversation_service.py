@@ -337,7 +337,7 @@ class ConversationService:
             # Get messages
             query = db.query(ConversationMessage).filter(
                 ConversationMessage.session_id == session.id
-            ).order_by(ConversationMessage.created_at)
+            ).order_by(ConversationMessage.created_at, ConversationMessage.id)
             
             if limit:
                 query = query.limit(limit)
@@ -188,7 +188,7 @@ class FusionCalculator:
             fulfillment_confidence=round(fulfillment_confidence, 2),
             dominant_mode=dominant_mode,
             pipeline_phase=self.pipeline_phase,
-            contributing_scores={k: round(v, 2) if v is not None else None for k, v in self.scores.items()},
+            contributing_scores=tuple((k, round(v, 2) if v is not None else None) for k, v in self.scores.items()),
             last_event_agent=self.last_event_agent,
             last_event_type=self.last_event_type,
             alert_level=alert_level,
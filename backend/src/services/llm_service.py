@@ -599,7 +599,7 @@ def _rule_based_interaction_check(items: List[OrderItem]) -> Dict[str, Any]:
     safe_to_dispense = True
     
     # Extract medicine names (lowercase for comparison)
-    medicine_names = [item.medicine_name.lower().strip() for item in items]
+    medicine_names = [item.medicine_name_lower.strip() for item in items]
     
     # Rule 1: Check for duplicate medicines
     seen = set()
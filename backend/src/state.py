@@ -1,5 +1,5 @@
 from typing import List, Optional, Dict, Any
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 from datetime import datetime
 from src.clinical_models import ClinicalContext
 
@@ -27,6 +27,14 @@ class OrderItem(BaseModel):
     in_stock: Optional[bool] = None
     price: Optional[float] = None
 
+    # Derived once at construction so matchers never re-lowercase the name
+    medicine_name_lower: str = ""
+
+    @model_validator(mode="after")
+    def _fill_medicine_name_lower(self) -> "OrderItem":
+        self.medicine_name_lower = self.medicine_name.lower()
+        return self
+
 
 # ============================================================
 # GLOBAL SHARED STATE (LANGGRAPH MEMORY)
@@ -83,6 +91,8 @@ class PharmacyState(BaseModel):
     risk_level: str = "normal"          # normal | elevated | high | critical
     risk_factors_triggered: List[str] = Field(default_factory=list)
     risk_escalated: bool = False        # True if this request triggered escalation
+    # Patient column changes from this turn, flushed in one UPDATE at pipeline end
+    pending_patient_updates: Dict[str, Any] = Field(default_factory=dict)
     
     # NEW: Multi-turn clinical context accumulator
     clinical_context: ClinicalContext = Field(default_factory=ClinicalContext)
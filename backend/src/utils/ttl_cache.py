@@ -0,0 +1,60 @@
+"""
+TTL CACHE
+=========
+Small thread-safe, size-bounded LRU cache with per-entry expiry.
+
+Used for hot read paths where a few seconds of staleness is acceptable
+and an external cache (Redis) would be overkill.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Tuple
+
+# Sentinel returned by get() on a miss, so None can be cached as a value
+MISS = object()
+
+
+class TTLCache:
+    """
+    LRU cache whose entries expire ttl_seconds after being stored.
+
+    Expired entries are evicted lazily on read; the least recently used
+    entry is evicted when maxsize is exceeded.
+    """
+
+    def __init__(self, maxsize: int, ttl_seconds: float) -> None:
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Any:
+        """Return the cached value for key, or MISS if absent or expired."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return MISS
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return MISS
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store value under key, evicting the oldest entry if full."""
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop every entry."""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
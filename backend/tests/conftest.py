@@ -49,6 +49,10 @@ def setup_test_db(monkeypatch, tmp_path):
 
     monkeypatch.setattr(db_config, "get_db_context", test_get_db_context)
 
+    # Cached medicine lookups must not leak between per-test databases
+    from src.database import invalidate_medicine_cache
+    invalidate_medicine_cache()
+
     # Seed data
     seeding_session = SessionTesting() # Directly create a session for seeding
     try:
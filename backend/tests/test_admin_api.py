@@ -2,6 +2,7 @@ import pytest
 from fastapi.testclient import TestClient
 from main import app
 from src.models import Order, Medicine, Patient, OrderItem
+from src.routes.admin import invalidate_admin_stats_cache
 from datetime import datetime
 
 client = TestClient(app)
@@ -21,6 +22,8 @@ def test_admin_stats(test_db, setup_test_db):
     db.add(order)
     db.commit()
     
+    # Stats are cached across requests; start from this test's database
+    invalidate_admin_stats_cache()
     response = client.get("/api/v1/admin/stats")
     assert response.status_code == 200
     data = response.json()
@@ -99,3 +102,113 @@ def test_order_action(test_db, setup_test_db):
     response = client.post("/api/v1/admin/orders/ORD-ACT-02/action", json={"status": "rejected"})
     assert response.status_code == 200
     assert response.json()["new_status"] == "cancelled"
+
+
+def test_admin_stats_cached_until_invalidated(test_db, setup_test_db):
+    """Repeat /stats hits are served from cache until an admin write."""
+    _, SessionTesting = setup_test_db
+    invalidate_admin_stats_cache()
+    first = client.get("/api/v1/admin/stats").json()
+    
+    db = SessionTesting()
+    db.add(Order(order_id="ORD-TEST-CACHE", user_id="PT-TEST-01", status="pending", total_amount=10.0))
+    db.commit()
+    db.close()
+    
+    assert client.get("/api/v1/admin/stats").json() == first
+    
+    response = client.post("/api/v1/admin/orders/ORD-TEST-CACHE/action", json={"status": "approved"})
+    assert response.status_code == 200
+    
+    total_orders = next(
+        s["value"] for s in client.get("/api/v1/admin/stats").json()["stats"]
+        if s["label"] == "TOTAL ORDERS"
+    )
+    assert total_orders == next(s["value"] for s in first["stats"] if s["label"] == "TOTAL ORDERS") + 1
+
+
+def test_admin_pending_waiting_time(test_db, setup_test_db):
+    """Pending orders report the DB-computed waiting time, oldest first."""
+    from datetime import timedelta
+    _, SessionTesting = setup_test_db
+    db = SessionTesting()
+    db.add(Order(order_id="ORD-WAIT-01", user_id="PT-CUST-01", status="pending",
+                 created_at=datetime.utcnow() - timedelta(hours=2, minutes=5)))
+    db.add(Order(order_id="ORD-WAIT-02", user_id="PT-CUST-01", status="pending"))
+    db.commit()
+    
+    response = client.get("/api/v1/admin/pending")
+    assert response.status_code == 200
+    data = response.json()
+    assert [o["id"] for o in data] == ["ORD-WAIT-01", "ORD-WAIT-02"]
+    assert data[1]["medicines"] == ""
+    assert data[0]["waiting"] in ("2h 5m", "2h 4m", "2h 6m")
+    assert data[1]["waiting"] == "0m"
+
+
+def test_admin_orders_pagination_and_export(test_db, setup_test_db):
+    """?limit pages the order list; the export streams every order."""
+    import json
+    _, SessionTesting = setup_test_db
+    db = SessionTesting()
+    for i in range(3):
+        db.add(Order(order_id=f"ORD-PAGE-0{i}", user_id="PT-CUST-01", status="pending", total_amount=1.0))
+    db.commit()
+    
+    first = client.get("/api/v1/admin/orders?limit=2")
+    assert len(first.json()) == 2
+    assert first.headers["X-Next-Offset"] == "2"
+    
+    rest = client.get("/api/v1/admin/orders?limit=2&offset=2")
+    assert len(rest.json()) == 1
+    assert "X-Next-Offset" not in rest.headers
+    
+    ids = {o["id"] for o in first.json() + rest.json()}
+    assert ids == {"ORD-PAGE-00", "ORD-PAGE-01", "ORD-PAGE-02"}
+    
+    export = client.get("/api/v1/admin/orders/export")
+    assert export.status_code == 200
+    exported = [json.loads(line) for line in export.text.splitlines()]
+    assert {o["id"] for o in exported} == ids
+
+
+def test_admin_orders_medicines_summary(test_db, setup_test_db):
+    """The medicines column is aggregated per order by the database."""
+    _, SessionTesting = setup_test_db
+    db = SessionTesting()
+    order = Order(order_id="ORD-SUM-01", user_id="PT-CUST-01", status="pending", total_amount=35.0)
+    db.add(order)
+    db.flush()
+    db.add_all([
+        OrderItem(order_id=order.id, medicine_id=1, medicine_name="Paracetamol", quantity=2, price=10.0),
+        OrderItem(order_id=order.id, medicine_id=2, medicine_name="Ibuprofen", quantity=1, price=15.0),
+    ])
+    db.commit()
+    
+    data = client.get("/api/v1/admin/orders").json()
+    summary = next(o["medicines"] for o in data if o["id"] == "ORD-SUM-01")
+    assert sorted(summary.split(", ")) == ["Ibuprofen (1x)", "Paracetamol (2x)"]
+
+
+def test_refill_alerts_urgency(test_db, setup_test_db):
+    """Urgency buckets and the urgent count come back from the query."""
+    from datetime import timedelta
+    from src.models import RefillPrediction
+    _, SessionTesting = setup_test_db
+    db = SessionTesting()
+    now = datetime.now()
+    for name, days in (("Urgent Med", 2), ("Soon Med", 6), ("Later Med", 20)):
+        db.add(RefillPrediction(
+            user_id="PT-REFILL-01", medicine_name=name, confidence=0.9,
+            predicted_depletion_date=now + timedelta(days=days, hours=12),
+        ))
+    db.add(RefillPrediction(user_id="PT-REFILL-01", medicine_name="No Date"))
+    db.commit()
+    
+    data = client.get("/api/v1/admin/refill-alerts").json()
+    assert [(a["medicine_name"], a["urgency"]) for a in data["alerts"]] == [
+        ("Urgent Med", "urgent"), ("Soon Med", "soon"), ("Later Med", "normal"),
+    ]
+    assert data["alerts"][0]["days_until_depletion"] == 2
+    assert data["total"] == 3
+    assert data["urgent_count"] == 1
@@ -15,6 +15,7 @@ from src.clinical_models import ClinicalContext
 from src.services.atc_service import ATCService
 from src.services.contraindication_service import ContraindicationService
 from src.services.interaction_service import InteractionService
+from src.prompts.clinical_reasoning_v2 import CLINICAL_SYSTEM_PROMPT, render_clinical_system_prompt
 
 
 def test_atc_hierarchy_parsing():
@@ -53,6 +54,18 @@ def test_atc_same_class():
     assert ATCService.are_same_class("A10BA02", "A10BB01") is False
 
 
+def test_clinical_prompt_render_matches_format():
+    """Precompiled prompt renders exactly like str.format, JSON braces included."""
+    fields = dict(
+        clinical_context='{"age": 30}',
+        contraindications="none",
+        interactions="none",
+        combinations="none",
+        inventory_context="[]",
+    )
+    assert render_clinical_system_prompt(**fields) == CLINICAL_SYSTEM_PROMPT.format(**fields)
+
+
 def test_contraindication_safe(test_db):
     """Test that a patient with no contraindications passes."""
     context = ClinicalContext(
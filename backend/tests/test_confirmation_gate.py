@@ -218,6 +218,44 @@ def test_fulfillment_gate_passes_with_confirmation():
     print("✅ fulfillment_gate_passes_with_confirmation passed")
 
 
+def test_risk_profile_persisted_when_order_awaits_confirmation(setup_test_db, monkeypatch):
+    """
+    An order stopped at the confirmation gate never reaches persist_patient,
+    so the gate itself must write the risk changes queued by risk scoring.
+    """
+    from src import db_config
+    from src.agents import risk_scoring_agent
+    from src.agents.fulfillment_agent import fulfillment_agent
+    from src.models import Patient
+
+    monkeypatch.setattr(risk_scoring_agent, "get_db_context", db_config.get_db_context)
+    with db_config.get_db_context() as db:
+        db.add(Patient(user_id="PT_GATE", risk_score=0, risk_flags=[]))
+        db.commit()
+
+    state = PharmacyState(
+        user_id="PT_GATE",
+        session_id="sess_gate_risk",
+        user_message="order tramadol",
+        extracted_items=[OrderItem(medicine_name="Tramadol", quantity=1)],
+        confirmation_confirmed=False,
+    )
+    state = risk_scoring_agent.run_risk_scoring_agent(state)
+    assert state.pending_patient_updates
+
+    try:
+        fulfillment_agent(state)
+        assert False, "Expected ConfirmationRequiredError was not raised"
+    except ConfirmationRequiredError:
+        pass
+
+    with db_config.get_db_context() as db:
+        patient = db.query(Patient).filter(Patient.user_id == "PT_GATE").one()
+        assert patient.risk_score == state.risk_score > 0
+        assert "controlled_substance:Tramadol" in patient.risk_flags
+    assert state.pending_patient_updates == {}
+
+
 # ===========================================================================
 # SECTION 4: Confirmation flow integration (state transitions)
 # ===========================================================================
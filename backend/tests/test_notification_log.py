@@ -0,0 +1,73 @@
+"""
+NOTIFICATION AUDIT LOG TESTS
+============================
+Check string interning in the notification log writer.
+"""
+
+import queue
+import sys
+from pathlib import Path
+
+import orjson
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.events.event_types import create_order_rejected_event
+from src.events.handlers import notification_handler
+from src.events.handlers.notification_handler import _LogWriter, _StringTable
+
+
+REASON = "Prescription required for Amoxicillin but none was uploaded"
+
+
+def _read_lines(path: Path):
+    return [orjson.loads(line) for line in path.read_bytes().splitlines()]
+
+
+def test_repeated_payload_string_written_once(monkeypatch, tmp_path):
+    """A detail string shared by several entries lands in the sidecar once."""
+    table = _StringTable(tmp_path / "notification_strings.jsonl")
+    writer = _LogWriter(tmp_path, "jsonl")
+    monkeypatch.setattr(notification_handler, "_string_table", table)
+    monkeypatch.setattr(notification_handler, "_jsonl_writer", writer)
+    monkeypatch.setattr(notification_handler, "_msgpack_writer", None)
+    monkeypatch.setattr(notification_handler, "_start_log_writer", lambda: None)
+    # A writer thread started by an earlier test blocks on the shared queue;
+    # drain a private one so it cannot steal entries or the sentinel
+    monkeypatch.setattr(notification_handler, "_log_queue", queue.SimpleQueue())
+
+    for user_id in ("user_1", "user_2", "user_3"):
+        event = create_order_rejected_event(user_id, REASON, {"note": REASON})
+        notification_handler._log_notification(event, "order_rejection", "sent")
+    notification_handler._log_queue.put_nowait(None)
+    notification_handler._drain_log_queue()
+    table.close()
+    writer.close()
+
+    strings = _read_lines(tmp_path / "notification_strings.jsonl")
+    assert strings == [{"id": 0, "text": REASON}]
+
+    (log_path,) = tmp_path.glob("notifications_*.jsonl")
+    entries = _read_lines(log_path)
+    assert len(entries) == 3
+    for entry in entries:
+        assert entry["event_payload"]["reason"] == {"$str": 0}
+        assert entry["event_payload"]["details"] == {"note": {"$str": 0}}
+
+
+def test_new_ids_follow_highest_loaded_id(tmp_path):
+    """Corrupt sidecar lines are skipped and new ids never reuse an old one."""
+    path = tmp_path / "notification_strings.jsonl"
+    path.write_bytes(
+        orjson.dumps({"id": 0, "text": "a" * 40}) + b"\n"
+        + orjson.dumps({"id": 5, "text": "b" * 40}) + b"\n"
+        + b"{not json\n"
+        + orjson.dumps({"id": 6, "text": "c" * 40}) + b"\n"
+    )
+    table = _StringTable(path)
+
+    assert table.intern("b" * 40) == 5
+    assert table.intern("c" * 40) == 6
+    assert table.intern("d" * 40) == 7
+    table.close()
@@ -0,0 +1,108 @@
+"""
+RISK SCORING AGENT TESTS
+========================
+Test the behavioral risk assessment (pure, no database).
+"""
+
+import sys
+from pathlib import Path
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.state import PharmacyState, OrderItem
+from src.agents.risk_scoring_agent import (
+    assess_request_risk,
+    _classify_medicine,
+    RISK_WEIGHTS,
+)
+
+
+def test_order_item_lowercase_name():
+    """OrderItem derives its lowercase name once at construction."""
+    item = OrderItem(medicine_name="Alprazolam XR", quantity=1)
+
+    assert item.medicine_name_lower == "alprazolam xr"
+
+
+def test_classify_medicine():
+    """Controlled wins over abuse potential; unknown names are unflagged."""
+    assert _classify_medicine("alprazolam 0.5mg") == "controlled"
+    assert _classify_medicine("pregabalin") == "abuse"
+    assert _classify_medicine("promethazine with codeine") == "controlled"
+    assert _classify_medicine("paracetamol") is None
+
+
+def test_assess_controlled_and_abuse():
+    """Controlled and abuse-potential items add their weights."""
+    state = PharmacyState(
+        user_id="test_user",
+        extracted_items=[
+            OrderItem(medicine_name="Tramadol", quantity=1),
+            OrderItem(medicine_name="Gabapentin", quantity=1),
+            OrderItem(medicine_name="Paracetamol", quantity=2),
+        ]
+    )
+
+    assessment = assess_request_risk(state)
+
+    assert "controlled_substance:Tramadol" in assessment["factors_triggered"]
+    assert "abuse_potential:Gabapentin" in assessment["factors_triggered"]
+    assert assessment["score_delta"] == (
+        RISK_WEIGHTS["controlled_substance_request"]
+        + RISK_WEIGHTS["abuse_potential_medicine"]
+    )
+
+
+def test_assess_multiple_controlled():
+    """Two controlled substances trigger the combination factor."""
+    state = PharmacyState(
+        user_id="test_user",
+        extracted_items=[
+            OrderItem(medicine_name="Diazepam", quantity=1),
+            OrderItem(medicine_name="Codeine", quantity=1),
+        ]
+    )
+
+    assessment = assess_request_risk(state)
+
+    assert "multiple_controlled_substances" in assessment["factors_triggered"]
+
+
+def test_assess_empty_request():
+    """No items and no rejection means no risk."""
+    state = PharmacyState(user_id="test_user")
+
+    assessment = assess_request_risk(state)
+
+    assert assessment["score_delta"] == 0
+    assert assessment["factors_triggered"] == []
+
+
+def test_assess_stops_at_score_cap():
+    """Once the cumulative score caps, remaining items are not scanned."""
+    state = PharmacyState(
+        user_id="test_user",
+        extracted_items=[
+            OrderItem(medicine_name="Morphine", quantity=1),
+            OrderItem(medicine_name="Fentanyl", quantity=1),
+        ]
+    )
+
+    assessment = assess_request_risk(state, old_score=90)
+
+    assert "controlled_substance:Morphine" in assessment["factors_triggered"]
+    assert "controlled_substance:Fentanyl" not in assessment["factors_triggered"]
+    assert "score_capped" in assessment["factors_triggered"]
+
+
+def test_calculate_risk_level_boundaries():
+    """Level table matches the documented 30/60/80 thresholds."""
+    from src.agents.risk_scoring_agent import calculate_risk_level
+
+    assert calculate_risk_level(0) == "normal"
+    assert calculate_risk_level(30) == "normal"
+    assert calculate_risk_level(31) == "elevated"
+    assert calculate_risk_level(61) == "high"
+    assert calculate_risk_level(81) == "critical"
+    assert calculate_risk_level(150) == "critical"
@@ -35,6 +35,15 @@ class TestSeverityIntegration(unittest.TestCase):
         self.assertEqual(result['risk_level'], "critical")
         self.assertEqual(result['route'], "EMERGENCY_ALERT")
 
+    @patch('src.agents.severity_scorer._get_ai_severity_score')
+    def test_emergency_skips_ai(self, mock_get_ai):
+        result = assess_severity("Sudden chest pain and sweating", {})
+        
+        mock_get_ai.assert_not_called()
+        self.assertEqual(result['route'], "EMERGENCY_ALERT")
+        self.assertTrue(result['emergency_override'])
+        self.assertEqual(result['red_flags_detected'], ["chest pain"])
+
     @patch('src.agents.severity_scorer._get_ai_severity_score')
     def test_low_severity(self, mock_get_ai):
         mock_get_ai.return_value = {
@@ -0,0 +1,107 @@
+"""
+MEDICINE NAME SIMILARITY TESTS
+==============================
+Check the pure-Python Levenshtein fallback against a reference DP.
+"""
+
+import sys
+import random
+from pathlib import Path
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import text
+
+from src import db_config
+from src.database import (
+    _levenshtein_distance,
+    _refresh_name_cache,
+    invalidate_medicine_cache,
+    _bounded_levenshtein,
+    _trim_common_affixes,
+    calculate_similarity,
+)
+
+
+def _reference_distance(str1: str, str2: str) -> int:
+    """Full-matrix Levenshtein DP, used as the correctness oracle."""
+    matrix = [[0] * (len(str2) + 1) for _ in range(len(str1) + 1)]
+    for i in range(len(str1) + 1):
+        matrix[i][0] = i
+    for j in range(len(str2) + 1):
+        matrix[0][j] = j
+    for i in range(1, len(str1) + 1):
+        for j in range(1, len(str2) + 1):
+            cost = 0 if str1[i-1] == str2[j-1] else 1
+            matrix[i][j] = min(
+                matrix[i-1][j] + 1,
+                matrix[i][j-1] + 1,
+                matrix[i-1][j-1] + cost
+            )
+    return matrix[len(str1)][len(str2)]
+
+
+def test_levenshtein_matches_reference():
+    """Bit-parallel distance agrees with the DP on random strings."""
+    rng = random.Random(42)
+    for _ in range(2000):
+        a = "".join(rng.choice("abcde") for _ in range(rng.randint(0, 20)))
+        b = "".join(rng.choice("abcde") for _ in range(rng.randint(0, 20)))
+        assert _levenshtein_distance(a, b) == _reference_distance(a, b), (a, b)
+
+
+def test_bounded_levenshtein_matches_reference():
+    """Bounded distance is exact up to k and reports k + 1 beyond it."""
+    rng = random.Random(7)
+    for _ in range(2000):
+        a = "".join(rng.choice("abc") for _ in range(rng.randint(0, 12)))
+        b = "".join(rng.choice("abc") for _ in range(rng.randint(0, 12)))
+        k = rng.randint(0, 6)
+        expected = _reference_distance(a, b)
+        got = _bounded_levenshtein(a, b, k)
+        assert got == (expected if expected <= k else k + 1), (a, b, k)
+
+
+def test_trim_common_affixes():
+    """Shared prefix and suffix are removed without overlapping."""
+    assert _trim_common_affixes("paracetamol 500", "paracetamol 650") == ("50", "65")
+    assert _trim_common_affixes("aaa", "aa") == ("a", "")
+    assert _trim_common_affixes("aspirin", "aspirin") == ("", "")
+
+
+def test_levenshtein_medicine_names():
+    """Typical typos in medicine names."""
+    assert _levenshtein_distance("paracetamol", "paracetmol") == 1
+    assert _levenshtein_distance("ibuprofen", "ibuprofin") == 1
+    assert _levenshtein_distance("amoxicillin", "amoxicilin") == 1
+
+
+def test_calculate_similarity_bounds():
+    """Identical strings score 1.0, empty against non-empty scores 0.0."""
+    assert calculate_similarity("aspirin", "aspirin") == 1.0
+    assert calculate_similarity("", "aspirin") == 0.0
+    assert calculate_similarity("paracetamol", "paracetmol") >= 0.7
+
+
+def test_name_cache_survives_stock_writes(setup_test_db):
+    """Stock-only invalidation keeps the name index; name writes reload it."""
+    with db_config.get_db_context() as db:
+        cache = _refresh_name_cache(db)
+        assert "paracetamol" in cache["names"]
+
+        db.execute(text("UPDATE medicines SET stock = stock - 1"))
+        db.commit()
+        invalidate_medicine_cache(names=False)
+        assert _refresh_name_cache(db) is cache
+
+        db.execute(text("UPDATE medicines SET name = 'Paracetamol Forte' WHERE name = 'Paracetamol'"))
+        db.commit()
+        invalidate_medicine_cache()
+        renamed = _refresh_name_cache(db)
+        assert "paracetamol forte" in renamed["names"]
+
+        # Rows inserted by another process are caught by the primary-key probe
+        db.execute(text("INSERT INTO medicines (name, price, stock) VALUES ('Cetirizine', 8.0, 30)"))
+        db.commit()
+        assert "cetirizine" in _refresh_name_cache(db)["names"]